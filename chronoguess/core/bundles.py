@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+
+from .catalog import catalog
+from .encoding import dumps
+from .models import CatalogBundle, Game, Occurrence
+
+BUNDLE_FIELDS = ['id', 'title', 'summary', 'photo_url']
+# Older bundles stay served for clients still holding their version.
+KEEP = 5
+
+
+def bundle_entry(occurrence):
+    # No year: the bundle also describes the cards still in players' hands.
+    return {field: getattr(occurrence, field) for field in BUNDLE_FIELDS}
+
+
+def bundle_json(lang, entries):
+    return dumps({'language': lang, 'occurrences': entries})
+
+
+def bundle_url(lang, version):
+    return reverse('catalog-bundle', kwargs={'lang': lang, 'version': version})
+
+
+def version_key(lang):
+    return f'bundle-version:{lang}'
+
+
+def build_bundle(lang):
+    """Stores the bundle of ``lang``'s occurrences, makes it current and
+    returns its version. An unchanged catalog gives the same version."""
+    entries = list(Occurrence.objects.filter(language=lang).order_by('id').values(*BUNDLE_FIELDS))
+    content = bundle_json(lang, entries)
+    version = hashlib.sha256(content).hexdigest()[:16]
+    CatalogBundle.objects.update_or_create(
+        language=lang, version=version, defaults={'content': gzip.compress(content, mtime=0)},
+    )
+    stale = CatalogBundle.objects.filter(language=lang).order_by('-updated_at').values_list('id', flat=True)[KEEP:]
+    CatalogBundle.objects.filter(id__in=list(stale)).delete()
+    catalog.cache.set(version_key(lang), version)
+    return version
+
+
+def current_version(lang):
+    """None until ``build_catalog_bundles`` or ``load_occurrences`` has built
+    one; requests never build it."""
+    version = catalog.cache.get(version_key(lang))
+    if version is None:
+        version = (
+            CatalogBundle.objects.filter(language=lang).order_by('-updated_at').values_list('version', flat=True).first()
+        )
+        if version is not None:
+            catalog.cache.set(version_key(lang), version)
+    return version
+
+
+def bundle_exists(lang, version):
+    return CatalogBundle.objects.filter(language=lang, version=version).exists()
+
+
+async def acurrent_version(lang):
+    version = await catalog.cache.aget(version_key(lang))
+    if version is None:
+        version = await sync_to_async(current_version)(lang)
+    return version
+
+
+class BundleContents:
+    """Gzipped bundles by language and version, kept in the worker after the
+    first read; a version's content never changes."""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._contents = {}
+        self._lock = threading.Lock()
+
+    def get(self, lang, version):
+        content = self._contents.get((lang, version))
+        if content is None:
+            content = (
+                CatalogBundle.objects.filter(language=lang, version=version).values_list('content', flat=True).first()
+            )
+            if content is None:
+                return None
+            content = bytes(content)
+            with self._lock:
+                if len(self._contents) >= self.max_entries:
+                    del self._contents[next(iter(self._contents))]
+                self._contents[(lang, version)] = content
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._contents.clear()
+
+
+bundle_contents = BundleContents()
+
+
+def partial_bundle(lang, ids):
+    """The current catalog's entries for ``ids``, for cards the client's
+    bundle doesn't have yet."""
+    occurrences = catalog.get_many(ids)
+    return bundle_json(lang, [
+        bundle_entry(occurrences[id]) for id in sorted(occurrences) if occurrences[id].language == lang
+    ])
+
+
+def game_language_key(game_id):
+    return f'game-language:{game_id}'
+
+
+async def agame_language(game_id):
+    # A game's language never changes.
+    lang = await catalog.cache.aget(game_language_key(game_id))
+    if lang is None:
+        lang = await Game.objects.filter(id=game_id).values_list('language', flat=True).afirst()
+        await catalog.cache.aset(game_language_key(game_id), lang)
+    return lang
+
+
+async def acompact_cards(match):
+    """The bundle URL (None while there is no bundle) and the mistake cards
+    ``compact_match_json`` needs."""
+    lang = await agame_language(match.game_id)
+    occurrences = await catalog.aget_many(match.mistake_ids)
+    mistakes = [occurrences[id] for id in match.mistake_ids if id in occurrences]
+    version = await acurrent_version(lang)
+    return bundle_url(lang, version) if version else None, mistakes
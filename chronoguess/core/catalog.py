@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import CallbackMetric, registry
+from .models import Occurrence
+
+
+class OccurrenceCatalog:
+    """Read-through cache of occurrences by id and of occurrence ids by
+    language, stored in the ``CATALOG_CACHE_ALIAS`` Django cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[settings.CATALOG_CACHE_ALIAS]
+
+    def occurrence_key(self, occurrence_id):
+        return f'occurrence:{occurrence_id}'
+
+    def language_key(self, lang):
+        return f'language:{lang}'
+
+    def _split(self, keys, cached):
+        occurrences = {keys[key]: occurrence for key, occurrence in cached.items()}
+        missing = [occurrence_id for occurrence_id in keys.values() if occurrence_id not in occurrences]
+        self.hits += len(occurrences)
+        self.misses += len(missing)
+        return occurrences, missing
+
+    def _entries(self, occurrences):
+        return {self.occurrence_key(occurrence_id): occurrence for occurrence_id, occurrence in occurrences.items()}
+
+    def get_many(self, ids):
+        keys = {self.occurrence_key(occurrence_id): occurrence_id for occurrence_id in ids}
+        occurrences, missing = self._split(keys, self.cache.get_many(keys))
+        if missing:
+            loaded = Occurrence.objects.in_bulk(missing)
+            self.cache.set_many(self._entries(loaded))
+            occurrences.update(loaded)
+        return occurrences
+
+    async def aget_many(self, ids):
+        keys = {self.occurrence_key(occurrence_id): occurrence_id for occurrence_id in ids}
+        occurrences, missing = self._split(keys, await self.cache.aget_many(keys))
+        if missing:
+            loaded = await Occurrence.objects.ain_bulk(missing)
+            await self.cache.aset_many(self._entries(loaded))
+            occurrences.update(loaded)
+        return occurrences
+
+    def get(self, occurrence_id):
+        return self.get_many([occurrence_id]).get(occurrence_id)
+
+    async def aget(self, occurrence_id):
+        return (await self.aget_many([occurrence_id])).get(occurrence_id)
+
+    def _language_queryset(self, lang):
+        return Occurrence.objects.filter(language=lang).order_by('id').values_list('id', flat=True)
+
+    def language_ids(self, lang: str):
+        ids = self.cache.get(self.language_key(lang))
+        if ids is None:
+            self.misses += 1
+            ids = list(self._language_queryset(lang))
+            self.cache.set(self.language_key(lang), ids)
+        else:
+            self.hits += 1
+        return ids
+
+    async def alanguage_ids(self, lang: str):
+        ids = await self.cache.aget(self.language_key(lang))
+        if ids is None:
+            self.misses += 1
+            ids = [occurrence_id async for occurrence_id in self._language_queryset(lang)]
+            await self.cache.aset(self.language_key(lang), ids)
+        else:
+            self.hits += 1
+        return ids
+
+    def invalidate_language(self, lang: str):
+        self.cache.delete(self.language_key(lang))
+
+    async def ainvalidate_language(self, lang: str):
+        await self.cache.adelete(self.language_key(lang))
+
+    def invalidate(self, occurrence):
+        self.cache.delete_many([
+            self.occurrence_key(occurrence.id),
+            *(self.language_key(lang) for lang in Occurrence.LanguageChoices.values),
+        ])
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+        }
+
+
+catalog = OccurrenceCatalog()
+
+registry.register(CallbackMetric(
+    'chronoguess_catalog_cache_hits_total', 'Occurrence catalog cache hits.', lambda: catalog.hits, kind='counter',
+))
+registry.register(CallbackMetric(
+    'chronoguess_catalog_cache_misses_total', 'Occurrence catalog cache misses.', lambda: catalog.misses, kind='counter',
+))
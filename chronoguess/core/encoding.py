@@ -0,0 +1,113 @@
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+ENCODERS = {
+    'json': stdlib_dumps,
+    'orjson': orjson.dumps if orjson else None,
+}
+
+
+def get_encoder(name=None):
+    """Returns the ``bytes``-producing encoder named by ``JSON_ENCODER``;
+    ``auto`` picks orjson when it is installed."""
+    name = name or settings.JSON_ENCODER
+    if name == 'auto':
+        name = 'orjson' if orjson else 'json'
+    if ENCODERS.get(name) is None:
+        raise ValueError(f"JSON encoder {name!r} is not available")
+    return ENCODERS[name]
+
+
+def dumps(obj):
+    return get_encoder()(obj)
+
+
+class FragmentCache:
+    """Encoded ``Occurrence.as_dict`` output per occurrence and year
+    visibility. Keys include ``updated_at``, so an edited occurrence gets a
+    new entry and the stale one ages out."""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._fragments = {}
+        self._lock = threading.Lock()
+
+    def get(self, occurrence, hide_year=False):
+        key = (occurrence.id, occurrence.updated_at, hide_year)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            fragment = dumps(occurrence.as_dict(hide_year=hide_year))
+            with self._lock:
+                if len(self._fragments) >= self.max_entries:
+                    del self._fragments[next(iter(self._fragments))]
+                self._fragments[key] = fragment
+        return fragment
+
+    def array(self, occurrences, hide_year=False):
+        return b'[' + b','.join(self.get(occurrence, hide_year) for occurrence in occurrences) + b']'
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+
+fragments = FragmentCache()
+
+
+def match_json(match):
+    # Same document as Match.as_dict(), spliced from cached card fragments.
+    cards = match.cards()
+    return b''.join([
+        b'{"id":', dumps(match.id),
+        b',"player_hand":', fragments.array(cards['player_hand'], hide_year=True),
+        b',"timeline":', fragments.array(cards['timeline']),
+        b',"mistakes":', fragments.array(cards['mistakes']),
+        b',"timeline_size_goal":', dumps(match.TIMELINE_SIZE_GOAL),
+        b',"remaining_life":', dumps(match.remaining_life),
+        b',"status":', dumps(match.status),
+        b'}',
+    ])
+
+
+def compact_match_json(match, catalog_url, mistakes):
+    # Cards by id into the bundle at catalog_url, with the years the player
+    # has already seen.
+    return dumps({
+        'id': match.id,
+        'catalog': catalog_url,
+        'player_hand': match.player_hand_ids,
+        'timeline': [{'id': id, 'year': year} for id, year in zip(match.timeline_ids, match.timeline_years)],
+        'mistakes': [{'id': occurrence.id, 'year': occurrence.year} for occurrence in mistakes],
+        'timeline_size_goal': match.TIMELINE_SIZE_GOAL,
+        'remaining_life': match.remaining_life,
+        'status': match.status,
+    })
+
+
+def play_json(status, match, content=None):
+    content = match_json(match) if content is None else content
+    return b'{"status":' + dumps(status) + b',"match":' + content + b'}'
+
+
+def plays_json(results, match, content=None):
+    content = match_json(match) if content is None else content
+    return b'{"results":' + dumps(results) + b',"match":' + content + b'}'
+
+
+class EncodedJsonResponse(HttpResponse):
+    def __init__(self, content, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content, **kwargs)
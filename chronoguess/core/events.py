@@ -0,0 +1,205 @@
+import asyncio
+import functools
+import json
+import logging
+import threading
+from collections import defaultdict
+
+import psycopg
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+from .catalog import catalog
+from .encoding import dumps
+from .metrics import CallbackMetric, registry
+
+logger = logging.getLogger('chronoguess.events')
+
+
+def play_event(match, played, position, correct, drawn):
+    """What changed in ``match`` after one play: the played card (its year
+    and, when correct, its timeline position), the card drawn into the
+    hand, and the lives and status left."""
+    return {
+        'version': match.version,
+        'result': 'correct' if correct else 'incorrect',
+        'played': {'id': played.id, 'year': played.year},
+        'position': position if correct else None,
+        'drawn': drawn.as_dict(hide_year=True) if drawn else None,
+        'remaining_life': match.remaining_life,
+        'status': match.status,
+    }
+
+
+def sse_message(event, data, id=None):
+    head = f'id: {id}\nevent: {event}\n' if id is not None else f'event: {event}\n'
+    return head.encode() + b'data: ' + dumps(data) + b'\n\n'
+
+
+class Subscription:
+    def __init__(self, broker, match_id):
+        self.broker = broker
+        self.match_id = match_id
+        self.subscriber = None
+
+    async def __aenter__(self):
+        self.subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        self.broker.add_subscriber(self.match_id, self.subscriber)
+        try:
+            await self.broker.listening()
+        except BaseException:
+            self.broker.remove_subscriber(self.match_id, self.subscriber)
+            raise
+        return self.subscriber[1]
+
+    async def __aexit__(self, *exc_info):
+        self.broker.remove_subscriber(self.match_id, self.subscriber)
+
+
+class InProcessBroker:
+    """Fans match events out to the subscribers in this process. Each
+    subscriber is an ``asyncio.Queue`` on its event loop, so an idle stream
+    costs one queue and no query.
+
+    Only reaches subscribers of the worker that saved the play; use
+    ``PostgresBroker`` with more than one worker."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    async def listening(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, match_id):
+        """``async with broker.subscribe(match_id) as queue``: each ``get()``
+        returns the list of events of one committed save."""
+        return Subscription(self, match_id)
+
+    def add_subscriber(self, match_id, subscriber):
+        with self._lock:
+            self._subscribers[match_id].add(subscriber)
+
+    def remove_subscriber(self, match_id, subscriber):
+        with self._lock:
+            self._subscribers[match_id].discard(subscriber)
+            if not self._subscribers[match_id]:
+                del self._subscribers[match_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def deliver(self, match_id, events):
+        with self._lock:
+            subscribers = list(self._subscribers.get(match_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, events)
+            except RuntimeError:
+                # The subscriber's loop closed under it.
+                pass
+
+    def publish(self, match_id, events):
+        """Called inside the play's transaction; ``events`` reach subscribers
+        once it commits."""
+        transaction.on_commit(lambda: self.deliver(match_id, events))
+
+
+class PostgresBroker(InProcessBroker):
+    """Publishes with ``NOTIFY`` in the play's transaction, which Postgres
+    delivers on commit, and keeps one ``LISTEN`` connection per worker that
+    hands notifications to the local subscribers.
+
+    Drawn cards are sent as ids and read back from the catalog by the
+    listener: their summaries would overflow the payload."""
+
+    CHANNEL = 'chronoguess_match_events'
+    RECONNECT_DELAY = 1
+    # Postgres refuses NOTIFY payloads of 8000 bytes or more.
+    MAX_PAYLOAD = 7999
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._ready = None
+
+    def _payload(self, match_id, events):
+        return json.dumps({'match_id': match_id, 'events': events}, ensure_ascii=False, separators=(',', ':'))
+
+    def publish(self, match_id, events):
+        events = [{**event, 'drawn': event['drawn']['id']} if event.get('drawn') else event for event in events]
+        payloads = [self._payload(match_id, events)]
+        if len(payloads[0].encode()) > self.MAX_PAYLOAD:
+            payloads = [self._payload(match_id, [event]) for event in events]
+        with connection.cursor() as cursor:
+            for payload in payloads:
+                cursor.execute('SELECT pg_notify(%s, %s)', [self.CHANNEL, payload])
+
+    async def _with_drawn_cards(self, events):
+        drawn = await catalog.aget_many([event['drawn'] for event in events if event.get('drawn')])
+        for event in events:
+            if event.get('drawn'):
+                card = drawn.get(event['drawn'])
+                event['drawn'] = card.as_dict(hide_year=True) if card else None
+        return events
+
+    def _connection_params(self):
+        params = connections['default'].get_connection_params()
+        # Django's sync cursor class and adapters don't fit an async connection.
+        params.pop('cursor_factory', None)
+        params.pop('context', None)
+        return params
+
+    async def listening(self):
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._ready = loop.create_future()
+            self._listener = loop.create_task(self._listen(self._ready))
+        # Subscribers wait for LISTEN so they can't miss a play that commits
+        # right after they read the match.
+        await asyncio.shield(self._ready)
+
+    async def stop(self):
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+
+    async def _listen(self, ready):
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(**self._connection_params(), autocommit=True)
+                async with conn:
+                    await conn.execute(f'LISTEN {self.CHANNEL}')
+                    if not ready.done():
+                        ready.set_result(None)
+                    async for notify in conn.notifies():
+                        payload = json.loads(notify.payload)
+                        self.deliver(payload['match_id'], await self._with_drawn_cards(payload['events']))
+            except psycopg.Error:
+                logger.exception('Match event listener lost its connection')
+                if not ready.done():
+                    ready.set_result(None)
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+@functools.cache
+def _broker(path):
+    return import_string(path)()
+
+
+def get_event_broker():
+    return _broker(settings.MATCH_EVENT_BROKER)
+
+
+registry.register(CallbackMetric(
+    'chronoguess_match_event_subscribers', 'Open match event streams in this worker.',
+    lambda: get_event_broker().subscriber_count(),
+))
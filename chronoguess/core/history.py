@@ -0,0 +1,58 @@
+from .catalog import catalog
+from .models import Game, Match, Occurrence, Play
+
+
+def _plays(match_id, after_version=0):
+    return Play.objects.filter(match_id=match_id, version__gt=after_version).order_by('version')
+
+
+def apply_plays(match, plays):
+    """Projects ``plays`` (ordered by version) onto ``match``, skipping the
+    ones its version already includes."""
+    # usecases reads matches through the repositories, which project plays.
+    from .usecases import play_occurrence
+
+    for play in plays:
+        if play.version <= match.version:
+            continue
+        if play.occurrence_id not in match.player_hand_ids:
+            raise ValueError(f"Play {play.version} of match {match.id} does not replay")
+        correct = play_occurrence(match, Occurrence(id=play.occurrence_id, year=play.year), play.position)
+        if correct != play.correct:
+            raise ValueError(f"Play {play.version} of match {match.id} does not replay")
+        # Versions skip the timeline re-sorts, which aren't plays.
+        match.version = play.version
+        match.updated_at = play.played_at
+    return match
+
+
+def catch_up(match):
+    return apply_plays(match, _plays(match.id, match.version))
+
+
+async def acatch_up(match):
+    return apply_plays(match, [play async for play in _plays(match.id, match.version)])
+
+
+def dealt_match(match):
+    """Unsaved copy of ``match`` as it was dealt, before any play."""
+    game = Game.objects.get(id=match.game_id)
+    return Match(
+        id=match.id,
+        game_id=match.game_id,
+        created_at=match.created_at,
+        player_hand_ids=[game.starting_hand_id],
+        timeline_ids=[game.starting_timeline_id],
+        timeline_years=[catalog.get(game.starting_timeline_id).year],
+        deck_ids=list(match.dealt_deck_ids),
+        dealt_deck_ids=list(match.dealt_deck_ids),
+    )
+
+
+def rebuild_match(match_id):
+    """Unsaved match rebuilt from its deal and its play log. It matches the
+    stored one unless an occurrence edit re-sorted the timeline since."""
+    match = Match.objects.get(id=match_id)
+    if not match.dealt_deck_ids:
+        raise ValueError(f"Match {match_id} was dealt before plays were logged")
+    return apply_plays(dealt_match(match), _plays(match_id))
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from chronoguess.core.stats import aggregate_batch
+
+
+class Command(BaseCommand):
+    help = "Adds the play log's new plays into the per-occurrence stats served by /api/occurrences/stats/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--settle", type=float, default=10, help="Seconds a play must be old before it is counted")
+        parser.add_argument("--pause", type=float, default=0.1, help="Seconds to sleep between batches")
+        parser.add_argument("--interval", type=float, help="Keep running, aggregating every this many seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            self.aggregate(options)
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+
+    def aggregate(self, options):
+        started = time.perf_counter()
+        settle = timedelta(seconds=options["settle"])
+        plays = 0
+        while batch := aggregate_batch(options["batch_size"], settle):
+            plays += batch
+            time.sleep(options["pause"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Aggregated {plays} plays in {elapsed:.2f}s")
@@ -0,0 +1,191 @@
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from chronoguess.core import pool
+
+from chronoguess.core.models import Occurrence
+from chronoguess.core.synthetic import bulk_create_occurrences, refresh_loaded, synthetic_occurrences
+from chronoguess.core.usecases import DEAL_SIZE
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class InProcessTransport:
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, payload=None):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            if method == "POST":
+                response = self.client.post(path, data=payload, content_type="application/json")
+            else:
+                response = self.client.get(path)
+        return response.status_code, response.json(), counter.count
+
+    def close(self):
+        connection.close()
+
+
+class HttpTransport:
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def request(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.url}{path}", data=data, method=method, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read()), None
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read() or b"null"), None
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Plays concurrent simulated matches to completion and reports latency and queries per endpoint as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Drive a running server instead of an in-process test database")
+        parser.add_argument("--players", type=int, default=8)
+        parser.add_argument("--matches", type=int, default=5, help="Matches each player plays to completion")
+        parser.add_argument("--catalog-size", type=int, default=1000, help="Synthetic occurrences seeded in-process")
+        parser.add_argument("--lang", default="en")
+        parser.add_argument("--game-pool", type=int, default=0, help="Pre-deal this many games before an in-process run")
+        parser.add_argument("--keepdb", action="store_true")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        if options["url"]:
+            report = self.run(lambda: HttpTransport(options["url"]), options)
+        else:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+            try:
+                # A kept database already holds the catalog of earlier runs.
+                existing = Occurrence.objects.filter(language=options["lang"]).count()
+                if existing < options["catalog_size"]:
+                    bulk_create_occurrences(
+                        synthetic_occurrences(options["catalog_size"] - existing, options["lang"], start=existing),
+                        ignore_conflicts=True,
+                    )
+                refresh_loaded([options["lang"]])
+                pool.fill(options["lang"], options["game_pool"], DEAL_SIZE)
+                with override_settings(GAME_POOL_SIZE=options["game_pool"]):
+                    report = self.run(InProcessTransport, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
+
+    def run(self, transport_factory, options):
+        samples = defaultdict(list)
+        lock = threading.Lock()
+
+        def record(endpoint, started, status, queries):
+            with lock:
+                samples[endpoint].append(((time.perf_counter() - started) * 1000, status, queries))
+
+        def player():
+            transport = transport_factory()
+            rng = random.Random()
+            try:
+                for _ in range(options["matches"]):
+                    self.play_match(transport, rng, options["lang"], record)
+            finally:
+                transport.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=player) for _ in range(options["players"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "commit": self.commit(),
+            "mode": options["url"] or "in-process",
+            "catalog_size": None if options["url"] else options["catalog_size"],
+            "game_pool": None if options["url"] else options["game_pool"],
+            "players": options["players"],
+            "matches": options["players"] * options["matches"],
+            "duration_s": round(elapsed, 3),
+            "requests_per_second": round(sum(map(len, samples.values())) / elapsed, 1),
+            "endpoints": {endpoint: self.summary(values, elapsed) for endpoint, values in samples.items()},
+        }
+
+    def play_match(self, transport, rng, lang, record):
+        started = time.perf_counter()
+        status, match, queries = transport.request("GET", f"/api/match/?lang={lang}")
+        record("create", started, status, queries)
+        if status != 200:
+            return
+        while match["status"] == "ongoing" and match["player_hand"]:
+            started = time.perf_counter()
+            status, match, queries = transport.request("GET", f"/api/match/{match['id']}/")
+            record("detail", started, status, queries)
+            if status != 200:
+                return
+
+            started = time.perf_counter()
+            status, result, queries = transport.request("POST", f"/api/match/{match['id']}/", {
+                "occurrence_id": rng.choice(match["player_hand"])["id"],
+                "position": rng.randint(0, len(match["timeline"])),
+            })
+            record("play", started, status, queries)
+            if status != 200:
+                return
+            match = result["match"]
+
+    def summary(self, values, elapsed):
+        latencies = sorted(latency for latency, _, _ in values)
+        queries = [count for _, _, count in values if count is not None]
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+        return {
+            "requests": len(values),
+            "errors": sum(1 for _, status, _ in values if status >= 400),
+            "requests_per_second": round(len(values) / elapsed, 1),
+            "latency_ms": {
+                "p50": round(cuts[49], 2),
+                "p95": round(cuts[94], 2),
+                "p99": round(cuts[98], 2),
+                "max": round(latencies[-1], 2),
+            },
+            "queries_per_request": round(statistics.mean(queries), 2) if queries else None,
+        }
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from chronoguess.core.models import Occurrence
+from chronoguess.core.sampler import OccurrenceSampler
+from chronoguess.core.synthetic import bulk_create_occurrences, synthetic_occurrences
+from chronoguess.core.usecases import DEAL_SIZE
+
+BENCH_LANGUAGE = 'bench'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compares ORDER BY RANDOM() dealing with the indexed sampler at several catalog sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,100000,1000000")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        repeat = options["repeat"]
+        self.stdout.write(f"{'occurrences':>12} {'order_by(?) ms':>15} {'index build ms':>15} {'sampler ms':>11}")
+        # Synthetic rows live in a throwaway language inside a transaction
+        # that is rolled back, so the real catalog is never touched.
+        try:
+            with transaction.atomic():
+                seeded = 0
+                for size in sizes:
+                    seeded += bulk_create_occurrences(synthetic_occurrences(size - seeded, BENCH_LANGUAGE, start=seeded))
+                    self.stdout.write(self.run_size(size, repeat))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run_size(self, size, repeat):
+        def random_order():
+            return list(Occurrence.objects.filter(language=BENCH_LANGUAGE).order_by('?')[:DEAL_SIZE])
+
+        sampler = OccurrenceSampler()
+        build_ms = self.time_ms(lambda: sampler.ids(BENCH_LANGUAGE))
+        random_order_ms = statistics.median(self.time_ms(random_order) for _ in range(repeat))
+        sampler_ms = statistics.median(
+            self.time_ms(lambda: sampler.deal(BENCH_LANGUAGE, DEAL_SIZE)) for _ in range(repeat)
+        )
+        return f"{size:>12} {random_order_ms:>15.2f} {build_ms:>15.2f} {sampler_ms:>11.2f}"
+
+    def time_ms(self, func):
+        started = time.perf_counter()
+        func()
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,75 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.test import override_settings
+from django.utils import timezone
+
+from chronoguess.core import encoding
+from chronoguess.core.encoding import FragmentCache, dumps, match_json
+from chronoguess.core.events import play_event
+from chronoguess.core.models import Match
+from chronoguess.core.synthetic import synthetic_occurrences
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares encoding a match through as_dict + JsonResponse with the cached-fragment encoders "
+        "and with a play delta"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeline", type=int, default=Match.TIMELINE_SIZE_GOAL - 1)
+        parser.add_argument("--mistakes", type=int, default=2)
+        parser.add_argument("--repeat", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        match = self.build_match(options["timeline"], options["mistakes"])
+        cards = match.cards()
+        event = play_event(match, cards["timeline"][0], 0, True, cards["player_hand"][0])
+        repeat = options["repeat"]
+
+        def cold():
+            # A fresh cache per call: every card is encoded from its dict.
+            encoding.fragments = FragmentCache()
+            return match_json(match)
+
+        baseline = self.time_us(lambda: JsonResponse(match.as_dict()).content, repeat)
+        self.stdout.write(f"{'path':<26} {'us/match':>9} {'speedup':>8}")
+        self.stdout.write(self.row("as_dict + JsonResponse", baseline, baseline))
+        for name in ("json", "orjson"):
+            if encoding.ENCODERS[name] is None:
+                self.stdout.write(f"{name}: not installed, skipped")
+                continue
+            with override_settings(JSON_ENCODER=name):
+                self.stdout.write(self.row(f"{name} fragments, cold", self.time_us(cold, repeat), baseline))
+                self.stdout.write(self.row(f"{name} fragments, warm", self.time_us(lambda: match_json(match), repeat), baseline))
+                self.stdout.write(self.row(f"{name} play delta", self.time_us(lambda: dumps(event), repeat), baseline))
+        encoding.fragments = FragmentCache()
+        self.stdout.write(f"bytes: full match {len(match_json(match))}, play delta {len(dumps(event))}")
+
+    def row(self, label, us, baseline):
+        return f"{label:<26} {us:>9.2f} {baseline / us:>7.1f}x"
+
+    def build_match(self, timeline_size, mistakes):
+        now = timezone.now()
+        cards = list(synthetic_occurrences(timeline_size + mistakes + 1, "en"))
+        for number, card in enumerate(cards, start=1):
+            card.id = number
+            card.updated_at = now
+        hand, timeline, mistaken = cards[:1], cards[1:timeline_size + 1], cards[timeline_size + 1:]
+        timeline.sort(key=lambda card: card.year)
+        match = Match(id=1, remaining_life=3 - len(mistaken))
+        match.reset_cards(player_hand=hand, timeline=timeline, mistakes=mistaken)
+        return match
+
+    def time_us(self, func, repeat):
+        func()
+        runs = []
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(repeat // 5):
+                func()
+            runs.append((time.perf_counter() - started) / (repeat // 5) * 1_000_000)
+        return statistics.median(runs)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from chronoguess.core.bundles import build_bundle
+from chronoguess.core.models import Occurrence
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the catalog bundles served at /api/catalog/<lang>/<version>.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument("languages", nargs="*", help="Defaults to every language")
+
+    def handle(self, *args, **options):
+        languages = options["languages"] or Occurrence.LanguageChoices.values
+        if unknown := set(languages) - set(Occurrence.LanguageChoices.values):
+            raise CommandError(f"Unknown languages: {', '.join(sorted(unknown))}")
+        for lang in languages:
+            self.stdout.write(f"Built the {lang} catalog bundle {build_bundle(lang)}")
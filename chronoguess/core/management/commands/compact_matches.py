@@ -0,0 +1,46 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chronoguess.core.models import Game, Match
+from chronoguess.core.retention import compact_batch
+
+
+class Command(BaseCommand):
+    help = "Archives finished and abandoned matches and deletes them with their games in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--finished-after", type=float, default=24, help="Hours since a won or lost match was last played")
+        parser.add_argument("--abandoned-after", type=float, default=24 * 7, help="Hours since an ongoing match was last played")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--pause", type=float, default=0.1, help="Seconds to sleep between batches")
+        parser.add_argument("--interval", type=float, help="Keep running, compacting every this many seconds")
+
+    def handle(self, *args, **options):
+        while True:
+            self.compact(options)
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+
+    def compact(self, options):
+        started = time.perf_counter()
+        now = timezone.now()
+        finished_before = now - timedelta(hours=options["finished_after"])
+        abandoned_before = now - timedelta(hours=options["abandoned_after"])
+        deleted = Counter()
+        after_id = 0
+        while after_id is not None:
+            batch, after_id = compact_batch(finished_before, abandoned_before, options["batch_size"], after_id)
+            if batch:
+                deleted += batch
+                time.sleep(options["pause"])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Archived {deleted[Match._meta.label]} matches, deleted {deleted[Game._meta.label]} games and "
+            f"{deleted[Game.deck.through._meta.label]} deck rows ({deleted.total()} rows) in {elapsed:.2f}s"
+        )
@@ -0,0 +1,46 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chronoguess.core.models import Match, Occurrence
+from chronoguess.core.usecases import DEAL_SIZE
+
+
+class Command(BaseCommand):
+    help = "Runs EXPLAIN ANALYZE on the queries behind match creation, reads and catalog loads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lang", default="en")
+        parser.add_argument("--match-id", type=int, help="Match to read; defaults to the latest one")
+
+    def handle(self, *args, **options):
+        lang = options["lang"]
+        ids = list(Occurrence.objects.filter(language=lang).values_list('id', flat=True)[:10000])
+        if not ids:
+            raise CommandError(f"No occurrences in language {lang!r}")
+        dealt = random.sample(ids, min(DEAL_SIZE, len(ids)))
+        titles = list(Occurrence.objects.filter(id__in=dealt).values_list('title', flat=True))
+        match_id = options["match_id"] or Match.objects.order_by('-id').values_list('id', flat=True).first()
+
+        queries = {
+            "catalog language ids": (
+                Occurrence.objects.filter(language=lang).order_by('id').values_list('id', flat=True)
+            ),
+            "catalog occurrences by id": Occurrence.objects.filter(id__in=dealt),
+            "load_occurrences natural key lookup": (
+                Occurrence.objects
+                .filter(language__in=[lang], title__in=titles)
+                .values_list('language', 'title', 'year')
+            ),
+            "ongoing matches holding an occurrence": Match.objects.filter(
+                status=Match.StatusChoices.ONGOING, timeline_ids__contains=[dealt[0]],
+            ).values_list('id', flat=True),
+        }
+        if match_id is not None:
+            queries["match by id"] = Match.objects.filter(pk=match_id)
+
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"-- {name}"))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+            self.stdout.write("")
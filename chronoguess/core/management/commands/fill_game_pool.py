@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chronoguess.core import pool
+from chronoguess.core.models import Occurrence
+from chronoguess.core.usecases import DEAL_SIZE
+
+
+class Command(BaseCommand):
+    help = "Tops up the pool of pre-dealt games that new matches claim"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=settings.GAME_POOL_SIZE, help="Games to keep ready per language")
+        parser.add_argument("--lang", action="append", choices=Occurrence.LanguageChoices.values)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--interval", type=float, help="Keep running, topping up every this many seconds")
+
+    def handle(self, *args, **options):
+        languages = options["lang"] or Occurrence.LanguageChoices.values
+        while True:
+            for lang in languages:
+                added = pool.fill(lang, options["size"], DEAL_SIZE, batch_size=options["batch_size"])
+                self.stdout.write(f"{lang}: added {added}, {pool.depth(lang)} ready")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,42 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from chronoguess.core.models import Occurrence
+from chronoguess.core.synthetic import (
+    YEAR_DISTRIBUTIONS, bulk_create_occurrences, refresh_loaded, synthetic_occurrences, year_sampler,
+)
+
+
+class Command(BaseCommand):
+    help = "Bulk-inserts synthetic occurrences for scale testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000, help="Occurrences per language")
+        parser.add_argument("--lang", action="append", choices=Occurrence.LanguageChoices.values)
+        parser.add_argument("--distribution", choices=YEAR_DISTRIBUTIONS, default="modern")
+        parser.add_argument(
+            "--duplicate-years", type=float, default=0.2, help="Share of cards drawn from a few popular years",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        year = year_sampler(options["distribution"], options["duplicate_years"], rng=rng)
+        languages = options["lang"] or Occurrence.LanguageChoices.values
+        for lang in languages:
+            started = time.perf_counter()
+            # Numbering continues after the existing rows so reruns add cards.
+            start = Occurrence.objects.filter(language=lang).count()
+            created = bulk_create_occurrences(
+                synthetic_occurrences(options["count"], lang, rng=rng, start=start, year=year),
+                batch_size=options["batch_size"],
+                ignore_conflicts=True,
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{lang}: generated {created} occurrences in {elapsed:.2f}s ({created / elapsed:.0f} rows/s)")
+
+        for lang, version in refresh_loaded(languages).items():
+            self.stdout.write(f"Built the {lang} catalog bundle {version}")
@@ -0,0 +1,82 @@
+import random
+import time
+from array import array
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DurationField, ExpressionWrapper, F, Value
+from django.db.models.functions import Now, Random
+
+from chronoguess.core.models import Game, Match, Occurrence, Play
+from chronoguess.core.synthetic import Card, synthetic_match
+from chronoguess.core.usecases import DEAL_SIZE
+
+
+def random_duration(limit):
+    return ExpressionWrapper(Random() * Value(limit), output_field=DurationField())
+
+
+class Command(BaseCommand):
+    help = "Bulk-inserts synthetic matches in mixed states, with their games, for scale testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1_000_000, help="Matches per language")
+        parser.add_argument("--lang", action="append", choices=Occurrence.LanguageChoices.values)
+        parser.add_argument("--days", type=float, default=30, help="Spread last plays over this many past days")
+        parser.add_argument("--skill", type=float, default=0.8, help="Chance that a play places its card correctly")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        for lang in options["lang"] or Occurrence.LanguageChoices.values:
+            ids, years = array('q'), array('i')
+            for occurrence_id, year in Occurrence.objects.filter(language=lang).values_list('id', 'year').iterator(50000):
+                ids.append(occurrence_id)
+                years.append(year)
+            if len(ids) < DEAL_SIZE:
+                raise CommandError(f"Language {lang!r} needs at least {DEAL_SIZE} occurrences")
+
+            started = time.perf_counter()
+            statuses = {status: 0 for status in Match.StatusChoices.values}
+            created = 0
+            while created < options["count"]:
+                deals = [
+                    [Card(ids[index], years[index]) for index in rng.sample(range(len(ids)), DEAL_SIZE)]
+                    for _ in range(min(options["batch_size"], options["count"] - created))
+                ]
+                matches, logs = zip(*(
+                    synthetic_match(cards, rng.randint(0, DEAL_SIZE - 1), options["skill"], rng) for cards in deals
+                ))
+                self.insert(lang, deals, matches, logs, timedelta(days=options["days"]))
+                for match in matches:
+                    statuses[match.status] += 1
+                created += len(matches)
+
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{lang}: generated {created} matches ({', '.join(f'{n} {s}' for s, n in statuses.items())}) "
+                f"in {elapsed:.2f}s ({created / elapsed:.0f} matches/s)"
+            )
+
+    def insert(self, lang, deals, matches, logs, spread):
+        GameDeck = Game.deck.through
+        with transaction.atomic():
+            games = Game.objects.bulk_create([
+                Game(language=lang, starting_hand_id=cards[0].id, starting_timeline_id=cards[1].id) for cards in deals
+            ])
+            GameDeck.objects.bulk_create([
+                GameDeck(game_id=game.id, occurrence_id=card.id) for game, cards in zip(games, deals) for card in cards[2:]
+            ])
+            for game, match in zip(games, matches):
+                match.game_id = game.id
+            Match.objects.bulk_create(matches)
+            for match, log in zip(matches, logs):
+                for play in log:
+                    play.match_id = match.id
+            Play.objects.bulk_create([play for log in logs for play in log])
+            # auto_now fields can't be set through bulk_create.
+            batch = Match.objects.filter(id__in=[match.id for match in matches])
+            batch.update(updated_at=Now() - random_duration(spread))
+            batch.update(created_at=F('updated_at') - random_duration(timedelta(hours=1)))
@@ -1,22 +1,81 @@
-from django.core.management.base import BaseCommand, CommandError
+import csv
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
 from django.conf import settings
 from chronoguess.core.models import Occurrence
+from chronoguess.core.synthetic import refresh_loaded
+
+
+def natural_key(occurrence):
+    return (occurrence.language, occurrence.title, occurrence.year)
+
 
 class Command(BaseCommand):
-    help = "Closes the specified poll for voting"
+    help = "Loads occurrences from a CSV file, skipping the ones already in the catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=f"{settings.BASE_DIR}/occurrences.csv")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
 
     def handle(self, *args, **options):
-        print("Loading occurrences from CSV...")
-        with open(f"{settings.BASE_DIR}/occurrences.csv", 'r') as file:
-            for line in file.readlines()[1:]:
-                parts = line.strip().split(',')
-                if len(parts) != 5:
-                    continue
-                title, summary, photo_url, year, lang = parts
-                Occurrence.objects.get_or_create(
-                    title=title,
-                    summary=summary,
-                    photo_url=photo_url,
-                    year=int(year),
-                    language=lang
-                )
\ No newline at end of file
+        self.stdout.write("Loading occurrences from CSV...")
+        started = time.perf_counter()
+        read = created = 0
+        languages = set()
+        seen = set()
+        existing = Occurrence.objects.count()
+        with open(options["path"], newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            rows = (occurrence for occurrence in map(self.parse_row, reader) if occurrence)
+            while batch := list(islice(rows, options["batch_size"])):
+                read += len(batch)
+                languages.update(occurrence.language for occurrence in batch)
+                if options["dry_run"]:
+                    created += len(self.new_occurrences(batch, seen))
+                else:
+                    # unique_occurrence_natural_key turns duplicates into skipped conflicts.
+                    Occurrence.objects.bulk_create(batch, ignore_conflicts=True)
+        if not options["dry_run"]:
+            created = Occurrence.objects.count() - existing
+
+        elapsed = time.perf_counter() - started
+        action = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(
+            f"{action} {created} of {read} occurrences in {elapsed:.2f}s "
+            f"({read / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+        if created and not options["dry_run"]:
+            for lang, version in refresh_loaded(languages).items():
+                self.stdout.write(f"Built the {lang} catalog bundle {version}")
+
+    def parse_row(self, parts):
+        if len(parts) != 5:
+            return None
+        title, summary, photo_url, year, lang = parts
+        try:
+            year = int(year)
+        except ValueError:
+            return None
+        return Occurrence(title=title, summary=summary, photo_url=photo_url, year=year, language=lang)
+
+    def new_occurrences(self, batch, seen):
+        """The occurrences of ``batch`` neither in the catalog nor in the
+        earlier batches, whose natural keys are in ``seen``."""
+        unique = {}
+        for occurrence in batch:
+            if natural_key(occurrence) not in seen:
+                unique.setdefault(natural_key(occurrence), occurrence)
+        seen.update(unique)
+        existing = set(
+            Occurrence.objects
+            .filter(
+                language__in={occurrence.language for occurrence in batch},
+                title__in={occurrence.title for occurrence in batch},
+            )
+            .values_list('language', 'title', 'year')
+        )
+        return [occurrence for key, occurrence in unique.items() if key not in existing]
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from chronoguess.core.history import rebuild_match
+from chronoguess.core.models import Match
+from chronoguess.core.repositories import get_match_repository
+
+COMPARED_FIELDS = ['timeline_ids', 'timeline_years', 'player_hand_ids', 'deck_ids', 'mistake_ids', 'remaining_life', 'status']
+
+
+class Command(BaseCommand):
+    help = "Rebuilds matches from their deal and play log and reports (or fixes) snapshots that differ"
+
+    def add_arguments(self, parser):
+        parser.add_argument("match_ids", nargs="*", type=int, help="Defaults to every ongoing match with a play log")
+        parser.add_argument("--fix", action="store_true", help="Overwrite differing snapshots with the rebuilt state")
+
+    def handle(self, *args, **options):
+        match_ids = options["match_ids"] or (
+            Match.objects
+            .filter(status=Match.StatusChoices.ONGOING)
+            .exclude(dealt_deck_ids=[])
+            .values_list("id", flat=True)
+            .iterator()
+        )
+        repository = get_match_repository()
+        checked = differing = 0
+        for match_id in match_ids:
+            checked += 1
+            with repository.locked(match_id) as match:
+                if match is None:
+                    continue
+                rebuilt = rebuild_match(match_id)
+                fields = [field for field in COMPARED_FIELDS if getattr(match, field) != getattr(rebuilt, field)]
+                if not fields:
+                    continue
+                differing += 1
+                self.stdout.write(f"Match {match_id} differs in {', '.join(fields)}")
+                if options["fix"]:
+                    for field in fields:
+                        setattr(match, field, getattr(rebuilt, field))
+                    match.version += 1
+                    repository.save(match, flush=True)
+
+        self.stdout.write(f"Checked {checked} matches, {differing} differ")
@@ -0,0 +1,115 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import request_db_duration, request_duration, request_queries
+
+logger = logging.getLogger('chronoguess.requests')
+
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = None
+        self.slowest_duration = 0.0
+
+    def add(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if duration >= self.slowest_duration:
+            self.slowest_sql = sql
+            self.slowest_duration = duration
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.add(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestMetricsMiddleware:
+    """Opt-in (``REQUEST_METRICS_ENABLED``) per-request timing: adds a
+    ``Server-Timing`` header, logs one JSON line per request and feeds the
+    histograms served by ``/api/_metrics``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Queries may run on any thread's connection, so the wrapper is on
+        # every connection and finds its request through a context variable.
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection=connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = current_recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    def finish(self, request, response, recorder, wall_time):
+        match = request.resolver_match
+        route = match.route if match else 'unmatched'
+        request_duration.observe(wall_time, route, request.method)
+        request_db_duration.observe(recorder.duration, route, request.method)
+        request_queries.observe(recorder.count, route, request.method)
+
+        response['Server-Timing'] = (
+            f'total;dur={wall_time * 1000:.2f}, '
+            f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"'
+        )
+        logger.info(json.dumps({
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': round(wall_time * 1000, 2),
+            'db_ms': round(recorder.duration * 1000, 2),
+            'queries': recorder.count,
+            'slowest_sql': recorder.slowest_sql[:500] if recorder.slowest_sql else None,
+            'slowest_sql_ms': round(recorder.slowest_duration * 1000, 2),
+        }))
+        return response
@@ -0,0 +1,92 @@
+# Generated by Django 6.0 on 2026-10-18 09:12
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+PILES = {
+    # pile: (array field, ordering of the through rows)
+    'timeline': ('timeline_ids', ('occurrence__year', 'id')),
+    'player_hand': ('player_hand_ids', ('id',)),
+    # Match.deck.first() used to draw by occurrence id.
+    'deck': ('deck_ids', ('occurrence_id',)),
+    'mistakes': ('mistake_ids', ('id',)),
+}
+BATCH_SIZE = 1000
+
+
+def copy_join_tables_to_arrays(apps, schema_editor):
+    Match = apps.get_model('core', 'Match')
+    match_ids = list(Match.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(match_ids), BATCH_SIZE):
+        matches = Match.objects.in_bulk(match_ids[start:start + BATCH_SIZE])
+        for pile, (field, ordering) in PILES.items():
+            through = Match._meta.get_field(pile).remote_field.through
+            rows = (
+                through.objects
+                .filter(match_id__in=matches.keys())
+                .order_by('match_id', *ordering)
+                .values_list('match_id', 'occurrence_id')
+            )
+            for match_id, occurrence_id in rows:
+                getattr(matches[match_id], field).append(occurrence_id)
+        Match.objects.bulk_update(matches.values(), [field for field, _ in PILES.values()])
+
+
+def copy_arrays_to_join_tables(apps, schema_editor):
+    Match = apps.get_model('core', 'Match')
+    for pile, (field, _) in PILES.items():
+        through = Match._meta.get_field(pile).remote_field.through
+        batch = []
+        for match_id, occurrence_ids in Match.objects.values_list('id', field).iterator():
+            batch.extend(through(match_id=match_id, occurrence_id=occurrence_id) for occurrence_id in occurrence_ids)
+            if len(batch) >= BATCH_SIZE:
+                through.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        through.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_occurrence_language'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='deck_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='mistake_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='player_hand_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='timeline_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None),
+        ),
+        migrations.RunPython(copy_join_tables_to_arrays, copy_arrays_to_join_tables),
+        migrations.RemoveField(
+            model_name='match',
+            name='deck',
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='mistakes',
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='player_hand',
+        ),
+        migrations.RemoveField(
+            model_name='match',
+            name='timeline',
+        ),
+    ]
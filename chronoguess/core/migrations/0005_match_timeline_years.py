@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_timeline_years(apps, schema_editor):
+    Match = apps.get_model('core', 'Match')
+    Occurrence = apps.get_model('core', 'Occurrence')
+    match_ids = list(Match.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(match_ids), BATCH_SIZE):
+        matches = Match.objects.in_bulk(match_ids[start:start + BATCH_SIZE]).values()
+        years = dict(
+            Occurrence.objects
+            .filter(id__in={id for match in matches for id in match.timeline_ids})
+            .values_list('id', 'year')
+        )
+        for match in matches:
+            match.timeline_years = [years[id] for id in match.timeline_ids]
+        Match.objects.bulk_update(matches, ['timeline_years'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_match_pile_arrays'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='timeline_years',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, size=None),
+        ),
+        migrations.RunPython(fill_timeline_years, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 6.0 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+PILE_FIELDS = ('timeline_ids', 'player_hand_ids', 'deck_ids', 'mistake_ids')
+
+
+def merge_duplicate_occurrences(apps, schema_editor):
+    Occurrence = apps.get_model('core', 'Occurrence')
+    Game = apps.get_model('core', 'Game')
+    Match = apps.get_model('core', 'Match')
+    GameDeck = Game._meta.get_field('deck').remote_field.through
+
+    duplicates = (
+        Occurrence.objects
+        .values('language', 'title', 'year')
+        .annotate(keep=models.Min('id'), copies=models.Count('id'))
+        .filter(copies__gt=1)
+    )
+    for group in duplicates:
+        keep = group.pop('keep')
+        group.pop('copies')
+        merged = list(Occurrence.objects.filter(**group).exclude(id=keep).values_list('id', flat=True))
+
+        Game.objects.filter(starting_hand_id__in=merged).update(starting_hand_id=keep)
+        Game.objects.filter(starting_timeline_id__in=merged).update(starting_timeline_id=keep)
+        game_ids = set(GameDeck.objects.filter(occurrence_id__in=merged).values_list('game_id', flat=True))
+        GameDeck.objects.filter(occurrence_id__in=merged).delete()
+        GameDeck.objects.bulk_create(
+            [GameDeck(game_id=game_id, occurrence_id=keep) for game_id in game_ids],
+            ignore_conflicts=True,
+        )
+
+        # Same natural key means same year, so timeline_years stay valid.
+        for field in PILE_FIELDS:
+            matches = list(Match.objects.filter(**{f'{field}__overlap': merged}))
+            for match in matches:
+                setattr(match, field, [keep if id in merged else id for id in getattr(match, field)])
+            Match.objects.bulk_update(matches, [field])
+
+        Occurrence.objects.filter(id__in=merged).delete()
+
+    # Fire the deferred FK checks now; Postgres refuses CREATE INDEX on a
+    # table with pending trigger events.
+    schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_match_timeline_years'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_occurrences, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='occurrence',
+            index=models.Index(fields=['language', 'id'], name='occurrence_language_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='occurrence',
+            constraint=models.UniqueConstraint(fields=('language', 'title', 'year'), name='unique_occurrence_natural_key'),
+        ),
+    ]
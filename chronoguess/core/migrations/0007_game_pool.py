@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+def fill_game_language(apps, schema_editor):
+    Game = apps.get_model('core', 'Game')
+    Occurrence = apps.get_model('core', 'Occurrence')
+    Game.objects.update(language=models.Subquery(
+        Occurrence.objects.filter(id=models.OuterRef('starting_hand_id')).values('language')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_occurrence_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='language',
+            field=models.CharField(choices=[('en', 'English'), ('pt-br', 'Portuguese')], default='en', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='pooled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(fill_game_language, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('pooled', True)), fields=['language', 'id'], name='game_pool_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 16:25
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_match_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('match_id', models.BigIntegerField(unique=True)),
+                ('language', models.CharField(choices=[('en', 'English'), ('pt-br', 'Portuguese')], max_length=10)),
+                ('status', models.CharField(choices=[('win', 'Win'), ('lose', 'Lose'), ('abandoned', 'Abandoned')], max_length=20)),
+                ('remaining_life', models.IntegerField()),
+                ('timeline_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+                ('mistake_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None)),
+                ('started_at', models.DateTimeField()),
+                ('last_played_at', models.DateTimeField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_match_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='seed',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='game',
+            constraint=models.UniqueConstraint(condition=models.Q(('seed__isnull', False)), fields=('language', 'seed'), name='unique_game_seed'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 17:20
+
+import django.contrib.postgres.fields
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fill_dealt_deck(apps, schema_editor):
+    # Only unplayed matches still hold their whole deck in draw order; older
+    # ones have no logged plays to rebuild from anyway.
+    Match = apps.get_model('core', 'Match')
+    Match.objects.filter(version=1).update(dealt_deck_ids=models.F('deck_ids'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_game_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='dealt_deck_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None),
+        ),
+        migrations.RunPython(fill_dealt_deck, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Play',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_id', models.BigIntegerField()),
+                ('version', models.PositiveIntegerField()),
+                ('occurrence_id', models.BigIntegerField()),
+                ('year', models.IntegerField()),
+                ('position', models.IntegerField()),
+                ('correct', models.BooleanField()),
+                ('offset', models.IntegerField(default=0)),
+                ('played_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('match_id', 'version'), name='unique_play_version')],
+            },
+        ),
+    ]
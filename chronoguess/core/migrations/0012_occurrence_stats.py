@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 17:50
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_play_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkpoint',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OccurrenceStats',
+            fields=[
+                ('occurrence', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.occurrence')),
+                ('language', models.CharField(choices=[('en', 'English'), ('pt-br', 'Portuguese')], max_length=20)),
+                ('played', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('placed_early', models.PositiveIntegerField(default=0)),
+                ('placed_late', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(models.F('language'), models.OrderBy(django.db.models.expressions.CombinedExpression(models.F('placed_early'), '+', models.F('placed_late')), descending=True), name='occurrence_stats_misplaced_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_occurrence_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogBundle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('language', models.CharField(choices=[('en', 'English'), ('pt-br', 'Portuguese')], max_length=20)),
+                ('version', models.CharField(max_length=16)),
+                ('content', models.BinaryField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('language', 'version'), name='unique_catalog_bundle_version')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 20:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_catalog_bundle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('status', 'ongoing')), fields=['timeline_ids'], name='match_ongoing_timeline_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_match_ongoing_timeline_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='play',
+            index=models.Index(condition=models.Q(('correct', True)), fields=['occurrence_id'], name='play_placed_idx'),
+        ),
+    ]
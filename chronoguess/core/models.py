@@ -1,4 +1,7 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -25,6 +28,15 @@ class Occurrence(BaseModel):
         default=LanguageChoices.ENGLISH
     )
 
+    class Meta:
+        indexes = [
+            # Index-only scan for the per-language id list the sampler deals from.
+            models.Index(fields=['language', 'id'], name='occurrence_language_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['language', 'title', 'year'], name='unique_occurrence_natural_key'),
+        ]
+
     def as_dict(self, hide_year=False):
         return {
             'id': self.id,
@@ -42,6 +54,29 @@ class Game(BaseModel):
     deck = models.ManyToManyField('Occurrence', related_name='game_deck')
     starting_hand = models.ForeignKey('Occurrence', on_delete=models.CASCADE, related_name='starting_hand_card')
     starting_timeline = models.ForeignKey('Occurrence', on_delete=models.CASCADE, related_name='starting_board_card')
+    language = models.CharField(
+        max_length=10,
+        choices=Occurrence.LanguageChoices,
+        default=Occurrence.LanguageChoices.ENGLISH
+    )
+    # Dealt ahead of time by fill_game_pool and not yet claimed by a match.
+    pooled = models.BooleanField(default=False)
+    # Set on seeded and daily deals, which every player of the seed shares.
+    seed = models.CharField(max_length=100, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['language', 'id'], condition=models.Q(pooled=True), name='game_pool_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['language', 'seed'], condition=models.Q(seed__isnull=False), name='unique_game_seed',
+            ),
+        ]
+
+def match_etag(match_id, version, compact=False):
+    return f'"{match_id}-{version}-compact"' if compact else f'"{match_id}-{version}"'
+
 
 class Match(BaseModel):
     
@@ -51,10 +86,17 @@ class Match(BaseModel):
         LOSE = 'lose', 'Lose'
 
     game = models.ForeignKey('Game', on_delete=models.CASCADE, related_name='match')
-    timeline = models.ManyToManyField('Occurrence', related_name='timeline_occurrences')
-    player_hand = models.ManyToManyField('Occurrence', related_name='player_hand')
-    deck = models.ManyToManyField('Occurrence', related_name='match_deck')
-    mistakes = models.ManyToManyField('Occurrence', related_name='mistakes')
+    # Each pile is an ordered list of occurrence ids: the timeline in board
+    # order, the deck in draw order, hand and mistakes in the order received.
+    timeline_ids = ArrayField(models.BigIntegerField(), default=list)
+    # Years of timeline_ids, same order, so placements are checked in memory.
+    timeline_years = ArrayField(models.IntegerField(), default=list)
+    player_hand_ids = ArrayField(models.BigIntegerField(), default=list)
+    deck_ids = ArrayField(models.BigIntegerField(), default=list)
+    # The deck in its draw order as dealt; with the game's starting cards and
+    # the match's plays it rebuilds every later state.
+    dealt_deck_ids = ArrayField(models.BigIntegerField(), default=list)
+    mistake_ids = ArrayField(models.BigIntegerField(), default=list)
     
     remaining_life = models.IntegerField(default=3)
     status = models.CharField(
@@ -62,14 +104,168 @@ class Match(BaseModel):
         choices=StatusChoices,
         default=StatusChoices.ONGOING
     )
+    # Bumped by every change to the piles; the detail view's ETag.
+    version = models.PositiveIntegerField(default=1)
+
+    TIMELINE_SIZE_GOAL = 12
+
+    class Meta:
+        indexes = [
+            # timeline_ids @> [id]: the ongoing matches an occurrence edit re-sorts.
+            GinIndex(
+                fields=['timeline_ids'], condition=models.Q(status='ongoing'), name='match_ongoing_timeline_idx',
+            ),
+        ]
+
+    CARD_PILES = {
+        'player_hand': 'player_hand_ids',
+        'timeline': 'timeline_ids',
+        'mistakes': 'mistake_ids',
+    }
+    _cards = None
+
+    def _card_ids(self):
+        return {id for field in self.CARD_PILES.values() for id in getattr(self, field)}
+
+    def _piles(self, occurrences):
+        return {
+            pile: [occurrences[id] for id in getattr(self, field) if id in occurrences]
+            for pile, field in self.CARD_PILES.items()
+        }
+
+    def cards(self):
+        # Every visible card read through the catalog, kept until reset_cards().
+        if self._cards is None:
+            from .catalog import catalog
+
+            self._cards = self._piles(catalog.get_many(self._card_ids()))
+        return self._cards
+
+    async def acards(self):
+        if self._cards is None:
+            from .catalog import catalog
+
+            self._cards = self._piles(await catalog.aget_many(self._card_ids()))
+        return self._cards
+
+    def reset_cards(self, **cards):
+        self._cards = cards or None
+
+    def sort_timeline(self):
+        years = dict(Occurrence.objects.filter(id__in=self.timeline_ids).values_list('id', 'year'))
+        self.timeline_ids = sorted(
+            (id for id in self.timeline_ids if id in years),
+            key=lambda id: years[id],
+        )
+        self.timeline_years = [years[id] for id in self.timeline_ids]
+        self.reset_cards()
+
+    @property
+    def etag(self):
+        return match_etag(self.id, self.version)
 
     def as_dict(self):
+        cards = self.cards()
         return {
             'id': self.id,
-            'player_hand': [occurrence.as_dict(hide_year=True) for occurrence in self.player_hand.all()],
-            'timeline': [occurrence.as_dict() for occurrence in self.timeline.order_by('year').all()],
-            'mistakes': [occurrence.as_dict() for occurrence in self.mistakes.all()],
-            'timeline_size_goal': 12,
+            'player_hand': [occurrence.as_dict(hide_year=True) for occurrence in cards['player_hand']],
+            'timeline': [occurrence.as_dict() for occurrence in cards['timeline']],
+            'mistakes': [occurrence.as_dict() for occurrence in cards['mistakes']],
+            'timeline_size_goal': self.TIMELINE_SIZE_GOAL,
             'remaining_life': self.remaining_life,
             'status': self.status,
-        }
\ No newline at end of file
+        }
+
+
+class Play(models.Model):
+    """One move of a match, appended and never updated. ``version`` is the
+    match version the move produced; ``year`` is the card's year when played,
+    so replaying gives the same result after the occurrence is edited.
+
+    Plain ids rather than foreign keys: the log outlives compacted matches
+    and deleted occurrences."""
+
+    match_id = models.BigIntegerField()
+    version = models.PositiveIntegerField()
+    occurrence_id = models.BigIntegerField()
+    year = models.IntegerField()
+    position = models.IntegerField()
+    correct = models.BooleanField()
+    # Slots between the position and the nearest correct one: negative when
+    # placed too early, positive when too late, 0 when correct.
+    offset = models.IntegerField(default=0)
+    played_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['match_id', 'version'], name='unique_play_version'),
+        ]
+        indexes = [
+            # The matches a card was placed on, cached ones included, that an occurrence edit re-sorts.
+            models.Index(fields=['occurrence_id'], condition=models.Q(correct=True), name='play_placed_idx'),
+        ]
+
+
+class OccurrenceStats(models.Model):
+    """Play counters of one occurrence, added up from the play log by
+    ``aggregate_play_stats``."""
+
+    occurrence = models.OneToOneField(Occurrence, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    language = models.CharField(max_length=20, choices=Occurrence.LanguageChoices)
+    played = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    placed_early = models.PositiveIntegerField(default=0)
+    placed_late = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                models.F('language'), (models.F('placed_early') + models.F('placed_late')).desc(),
+                name='occurrence_stats_misplaced_idx',
+            ),
+        ]
+
+
+class Checkpoint(models.Model):
+    """How far a consumer of the play log has read, by ``Play`` id."""
+
+    name = models.CharField(max_length=100, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class CatalogBundle(BaseModel):
+    """Gzipped JSON of a language's occurrences, without years, served
+    as-is at ``/api/catalog/<language>/<version>.json``. ``version`` is a
+    hash of the content, so a version's bundle never changes; the most
+    recently built one is current."""
+
+    language = models.CharField(max_length=20, choices=Occurrence.LanguageChoices)
+    version = models.CharField(max_length=16)
+    content = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['language', 'version'], name='unique_catalog_bundle_version'),
+        ]
+
+
+class MatchArchive(BaseModel):
+    """Compact record of a finished or abandoned match, written by
+    compact_matches before the match and its game are deleted."""
+
+    class StatusChoices(models.TextChoices):
+        WIN = 'win', 'Win'
+        LOSE = 'lose', 'Lose'
+        ABANDONED = 'abandoned', 'Abandoned'
+
+    match_id = models.BigIntegerField(unique=True)
+    language = models.CharField(max_length=10, choices=Occurrence.LanguageChoices)
+    status = models.CharField(max_length=20, choices=StatusChoices)
+    remaining_life = models.IntegerField()
+    timeline_ids = ArrayField(models.BigIntegerField(), default=list)
+    mistake_ids = ArrayField(models.BigIntegerField(), default=list)
+    started_at = models.DateTimeField()
+    last_played_at = models.DateTimeField()
+
@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.db import transaction
+from django.db.models import Count
+
+from .metrics import CallbackMetric, Histogram, registry
+from .models import Game, Occurrence
+from .sampler import sampler
+
+GameDeck = Game.deck.through
+
+
+def depth(lang=None):
+    games = Game.objects.filter(pooled=True)
+    if lang is not None:
+        games = games.filter(language=lang)
+    return games.count()
+
+
+def fill(lang: str, size: int, deal_size: int, batch_size=100):
+    """Deals pooled games for ``lang`` until ``size`` are waiting to be
+    claimed, returning how many were added."""
+    missing = size - depth(lang)
+    added = 0
+    while added < missing:
+        deals = [sampler.deal(lang, deal_size) for _ in range(min(batch_size, missing - added))]
+        with transaction.atomic():
+            games = Game.objects.bulk_create([
+                Game(language=lang, pooled=True, starting_hand=deal[0], starting_timeline=deal[1])
+                for deal in deals
+            ])
+            GameDeck.objects.bulk_create([
+                GameDeck(game_id=game.id, occurrence_id=occurrence.id)
+                for game, deal in zip(games, deals)
+                for occurrence in deal[2:]
+            ])
+        added += len(deals)
+    return added
+
+
+def claim(lang: str):
+    """Takes one pooled game out of the pool, skipping rows other workers
+    are claiming. Returns the game and its deck ids in a fresh random draw
+    order, or ``None`` when the pool is empty. Must run in a transaction."""
+    started = time.perf_counter()
+    game = (
+        Game.objects
+        .select_for_update(skip_locked=True)
+        .filter(pooled=True, language=lang)
+        .order_by('id')
+        .first()
+    )
+    if game is None:
+        pool_claim_duration.observe(time.perf_counter() - started, lang, 'empty')
+        return None
+    game.pooled = False
+    game.save(update_fields=['pooled', 'updated_at'])
+    deck_ids = list(GameDeck.objects.filter(game_id=game.id).values_list('occurrence_id', flat=True))
+    random.shuffle(deck_ids)
+    pool_claim_duration.observe(time.perf_counter() - started, lang, 'claimed')
+    return game, deck_ids
+
+
+pool_claim_duration = registry.register(Histogram(
+    'chronoguess_game_pool_claim_seconds', 'Time to claim a pre-dealt game.', labels=('language', 'outcome'),
+))
+registry.register(CallbackMetric(
+    'chronoguess_game_pool_depth', 'Pre-dealt games waiting to be claimed.',
+    lambda: {(lang,): 0 for lang in Occurrence.LanguageChoices.values} | {
+        (row['language'],): row['games']
+        for row in Game.objects.filter(pooled=True).values('language').annotate(games=Count('id'))
+    },
+    labels=('language',),
+))
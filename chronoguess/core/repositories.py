@@ -0,0 +1,221 @@
+import functools
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .history import acatch_up, apply_plays, catch_up
+from .models import Match, Play
+from .versions import versions
+
+MATCH_STATE_FIELDS = [
+    'timeline_ids', 'timeline_years', 'player_hand_ids', 'deck_ids', 'mistake_ids', 'remaining_life', 'status', 'version',
+    'updated_at',
+]
+
+
+class MatchBusy(Exception):
+    """Another play held the match for longer than ``MATCH_STORE_LOCK_WAIT``."""
+
+
+class DatabaseMatchRepository:
+    """Loads and saves matches straight from Postgres; ``locked`` holds the
+    match row lock for the duration of a play."""
+
+    def get(self, match_id):
+        return Match.objects.filter(id=match_id).first()
+
+    async def aget(self, match_id):
+        return await Match.objects.filter(id=match_id).afirst()
+
+    async def aversion(self, match_id):
+        return await versions.aget(match_id)
+
+    @contextmanager
+    def locked(self, match_id):
+        with transaction.atomic():
+            yield Match.objects.select_for_update().filter(id=match_id).first()
+
+    def save(self, match, plays=(), flush=False):
+        """Saves ``match`` after ``plays``. ``flush`` writes the row right
+        away, for changes the play log can't replay."""
+        match.save(update_fields=MATCH_STATE_FIELDS)
+        Play.objects.bulk_create(plays)
+        transaction.on_commit(lambda: versions.changed(match))
+
+    def created(self, match):
+        pass
+
+    async def acreated(self, match):
+        pass
+
+    def forget(self, match_ids):
+        versions.forget(match_ids)
+
+    def ongoing_with(self, occurrence_id):
+        """Ids of the ongoing matches with ``occurrence_id`` on their timeline."""
+        return set(
+            Match.objects
+            .filter(status=Match.StatusChoices.ONGOING, timeline_ids__contains=[occurrence_id])
+            .values_list('id', flat=True)
+        )
+
+    def current(self, matches):
+        """``matches``, rows read from the database, brought up to their last
+        play; every play writes the row here."""
+        return matches
+
+
+class CacheMatchRepository(DatabaseMatchRepository):
+    """Keeps ongoing matches as one record each in the
+    ``MATCH_STORE_CACHE_ALIAS`` cache, for ``MATCH_STORE_TTL`` seconds after
+    their last play. Plays are appended to the play log and
+    update the cache; the match row is written behind, every
+    ``MATCH_STORE_FLUSH_EVERY`` versions and when the match ends, and caught
+    up from the log when it is read back, so a lost cache loses no play."""
+
+    LOCK_TIMEOUT = 5
+    FIELDS = ['id', 'game_id', 'created_at', *MATCH_STATE_FIELDS]
+
+    @property
+    def cache(self):
+        cache = caches[settings.MATCH_STORE_CACHE_ALIAS]
+        # Each worker would lock and store its own copy of the match.
+        if settings.GUNICORN_WORKERS > 1 and isinstance(cache, (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                f"CacheMatchRepository needs a cache shared by the {settings.GUNICORN_WORKERS} workers; "
+                f"{settings.MATCH_STORE_CACHE_ALIAS!r} is local to each process"
+            )
+        return cache
+
+    def key(self, match_id):
+        return f'match:{match_id}'
+
+    def lock_key(self, match_id):
+        return f'match-lock:{match_id}'
+
+    def _dump(self, match, flushed_version):
+        return ({field: getattr(match, field) for field in self.FIELDS}, flushed_version)
+
+    def _load(self, record):
+        state, flushed_version = record
+        match = Match(**state)
+        match._state.adding = False
+        match._state.db = 'default'
+        match.flushed_version = flushed_version
+        return match
+
+    def _store(self, match):
+        self.cache.set(self.key(match.id), self._dump(match, match.flushed_version), settings.MATCH_STORE_TTL)
+
+    def get(self, match_id):
+        record = self.cache.get(self.key(match_id))
+        if record is not None:
+            return self._load(record)
+        match = super().get(match_id)
+        if match is not None:
+            match.flushed_version = match.version
+            catch_up(match)
+            # Finished matches are read from their rows, which hold their last play.
+            if match.status == Match.StatusChoices.ONGOING:
+                self.cache.add(self.key(match_id), self._dump(match, match.flushed_version), settings.MATCH_STORE_TTL)
+        return match
+
+    async def aget(self, match_id):
+        record = await self.cache.aget(self.key(match_id))
+        if record is not None:
+            return self._load(record)
+        match = await super().aget(match_id)
+        if match is not None:
+            match.flushed_version = match.version
+            await acatch_up(match)
+            if match.status == Match.StatusChoices.ONGOING:
+                await self.cache.aadd(
+                    self.key(match_id), self._dump(match, match.flushed_version), settings.MATCH_STORE_TTL,
+                )
+        return match
+
+    async def aversion(self, match_id):
+        match = await self.aget(match_id)
+        return match.version if match else None
+
+    @contextmanager
+    def locked(self, match_id):
+        # cache.add is atomic on the shared backends; the timeout frees the
+        # lock of a worker that died holding it.
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.MATCH_STORE_LOCK_WAIT
+        while not self.cache.add(self.lock_key(match_id), token, self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise MatchBusy(f"Match {match_id} is busy")
+            time.sleep(0.002)
+        try:
+            yield self.get(match_id)
+        finally:
+            if self.cache.get(self.lock_key(match_id)) == token:
+                self.cache.delete(self.lock_key(match_id))
+
+    def save(self, match, plays=(), flush=False):
+        Play.objects.bulk_create(plays)
+        # Kept current in the cache record; only a flush writes it to the row.
+        match.updated_at = timezone.now()
+        finished = match.status != Match.StatusChoices.ONGOING
+        if flush or finished or match.version - match.flushed_version >= settings.MATCH_STORE_FLUSH_EVERY:
+            match.save(update_fields=MATCH_STATE_FIELDS)
+            match.flushed_version = match.version
+        if finished:
+            self.cache.delete(self.key(match.id))
+        else:
+            self._store(match)
+
+    def created(self, match):
+        self.cache.set(self.key(match.id), self._dump(match, match.version), settings.MATCH_STORE_TTL)
+
+    async def acreated(self, match):
+        await self.cache.aset(self.key(match.id), self._dump(match, match.version), settings.MATCH_STORE_TTL)
+
+    def forget(self, match_ids):
+        self.cache.delete_many([self.key(match_id) for match_id in match_ids])
+
+    def ongoing_with(self, occurrence_id):
+        # Rows miss the cards placed since their last flush; the log has them.
+        placed = Play.objects.filter(occurrence_id=occurrence_id, correct=True).values('match_id')
+        return super().ongoing_with(occurrence_id) | set(
+            Match.objects.filter(status=Match.StatusChoices.ONGOING, id__in=placed).values_list('id', flat=True)
+        )
+
+    def current(self, matches):
+        records = self.cache.get_many([self.key(match.id) for match in matches])
+        evicted = []
+        for match in matches:
+            record = records.get(self.key(match.id))
+            if record is not None:
+                state, _ = record
+                for field in MATCH_STATE_FIELDS:
+                    setattr(match, field, state[field])
+            elif match.status == Match.StatusChoices.ONGOING:
+                evicted.append(match)
+        plays = defaultdict(list)
+        for play in Play.objects.filter(match_id__in=[match.id for match in evicted]).order_by('match_id', 'version'):
+            plays[play.match_id].append(play)
+        for match in evicted:
+            apply_plays(match, plays[match.id])
+        return matches
+
+
+@functools.cache
+def _repository(path):
+    return import_string(path)()
+
+
+def get_match_repository():
+    return _repository(settings.MATCH_REPOSITORY)
@@ -0,0 +1,87 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Game, Match, MatchArchive
+from .repositories import get_match_repository
+from .usecases import seeded_game_key
+
+
+def _archive(match):
+    return MatchArchive(
+        match_id=match.id,
+        language=match.game.language,
+        status=(
+            MatchArchive.StatusChoices.ABANDONED
+            if match.status == Match.StatusChoices.ONGOING
+            else match.status
+        ),
+        remaining_life=match.remaining_life,
+        timeline_ids=match.timeline_ids,
+        mistake_ids=match.mistake_ids,
+        started_at=match.created_at,
+        last_played_at=match.updated_at,
+    )
+
+
+def _candidates(finished_before, abandoned_before, batch_size, after_id):
+    """The finished and abandoned matches among the ``batch_size`` matches
+    after ``after_id``, and the last id of those, or None past the last match.
+    Walking the primary key spares every play an index write on updated_at."""
+    ids = list(Match.objects.filter(id__gt=after_id).order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return [], None
+    matches = (
+        Match.objects
+        .select_for_update(skip_locked=True, of=('self',))
+        .select_related('game')
+        .filter(id__gt=after_id, id__lte=ids[-1])
+        .filter(
+            Q(status__in=[Match.StatusChoices.WIN, Match.StatusChoices.LOSE], updated_at__lt=finished_before)
+            | Q(status=Match.StatusChoices.ONGOING, updated_at__lt=abandoned_before)
+        )
+        .order_by('id')
+    )
+    return list(matches), ids[-1]
+
+
+def _still_played(matches, abandoned_before):
+    """Moves ``updated_at`` up on the ongoing ``matches`` whose last play the
+    match repository hasn't written to their rows yet, and returns them."""
+    played = [
+        match for match in matches
+        if match.status == Match.StatusChoices.ONGOING and match.updated_at >= abandoned_before
+    ]
+    Match.objects.bulk_update(played, ['updated_at'])
+    return played
+
+
+def compact_batch(finished_before, abandoned_before, batch_size=500, after_id=0):
+    """Archives and deletes the matches among the ``batch_size`` after
+    ``after_id`` finished before ``finished_before`` or left ongoing since
+    ``abandoned_before``, with the unpooled games only they used. Matches
+    locked by a play in progress are skipped. Returns deleted row counts by
+    model label and the id to continue after, None once all are done."""
+    with transaction.atomic():
+        matches, last_id = _candidates(finished_before, abandoned_before, batch_size, after_id)
+        # Archived as the repository has them, plays not yet on the row included.
+        matches = get_match_repository().current(matches)
+        played = {match.id for match in _still_played(matches, abandoned_before)}
+        matches = [match for match in matches if match.id not in played]
+        if not matches:
+            return Counter(), last_id
+        MatchArchive.objects.bulk_create([_archive(match) for match in matches], ignore_conflicts=True)
+        match_ids = [match.id for match in matches]
+        _, deleted = Match.objects.filter(id__in=match_ids).delete()
+        games = Game.objects.filter(id__in={match.game_id for match in matches}, pooled=False, match__isnull=True)
+        seeded_keys = [
+            seeded_game_key(lang, seed)
+            for lang, seed in games.filter(seed__isnull=False).values_list('language', 'seed')
+        ]
+        _, deleted_games = games.delete()
+        transaction.on_commit(lambda: get_match_repository().forget(match_ids))
+        # A later match of the seed deals it again.
+        transaction.on_commit(lambda: cache.delete_many(seeded_keys))
+    return Counter(deleted) + Counter(deleted_games), last_id
@@ -0,0 +1,78 @@
+import random
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+from .catalog import catalog
+
+
+class OccurrenceSampler:
+    """Per-language in-process index of occurrence ids used to deal cards
+    without an ``ORDER BY RANDOM()`` scan of the whole catalog."""
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _fresh_index(self, lang):
+        entry = self._indexes.get(lang)
+        if entry is None or time.monotonic() - entry[0] > settings.SAMPLER_INDEX_TTL:
+            return None
+        return entry[1]
+
+    def _store_index(self, lang, ids):
+        ids = array('q', ids)
+        with self._lock:
+            self._indexes[lang] = (time.monotonic(), ids)
+        return ids
+
+    def ids(self, lang: str):
+        ids = self._fresh_index(lang)
+        if ids is None:
+            ids = self._store_index(lang, catalog.language_ids(lang))
+        return ids
+
+    async def aids(self, lang: str):
+        ids = self._fresh_index(lang)
+        if ids is None:
+            ids = self._store_index(lang, await catalog.alanguage_ids(lang))
+        return ids
+
+    def invalidate(self, lang=None):
+        with self._lock:
+            if lang is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(lang, None)
+
+    def _sample(self, ids, size, rng):
+        return rng.sample(ids, min(size, len(ids)))
+
+    def _dealt(self, sampled_ids, occurrences):
+        return [occurrences[occurrence_id] for occurrence_id in sampled_ids if occurrence_id in occurrences]
+
+    def deal(self, lang: str, size: int, rng=random):
+        sampled_ids = self._sample(self.ids(lang), size, rng)
+        occurrences = catalog.get_many(sampled_ids)
+        if len(occurrences) < len(sampled_ids):
+            # Rows were deleted by another process since the index was built.
+            self.invalidate(lang)
+            catalog.invalidate_language(lang)
+            sampled_ids = self._sample(self.ids(lang), size, rng)
+            occurrences = catalog.get_many(sampled_ids)
+        return self._dealt(sampled_ids, occurrences)
+
+    async def adeal(self, lang: str, size: int, rng=random):
+        sampled_ids = self._sample(await self.aids(lang), size, rng)
+        occurrences = await catalog.aget_many(sampled_ids)
+        if len(occurrences) < len(sampled_ids):
+            self.invalidate(lang)
+            await catalog.ainvalidate_language(lang)
+            sampled_ids = self._sample(await self.aids(lang), size, rng)
+            occurrences = await catalog.aget_many(sampled_ids)
+        return self._dealt(sampled_ids, occurrences)
+
+
+sampler = OccurrenceSampler()
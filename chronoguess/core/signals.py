@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalog import catalog
+from .models import Match, Occurrence
+from .repositories import get_match_repository
+from .sampler import sampler
+
+
+@receiver(post_save, sender=Occurrence)
+@receiver(post_delete, sender=Occurrence)
+def invalidate_occurrence_indexes(sender, instance, **kwargs):
+    catalog.invalidate(instance)
+    sampler.invalidate()
+
+
+@receiver(pre_save, sender=Occurrence)
+def remember_saved_year(sender, instance, **kwargs):
+    instance.saved_year = Occurrence.objects.filter(id=instance.id).values_list('year', flat=True).first()
+
+
+@receiver(post_save, sender=Occurrence)
+def sync_ongoing_timelines(sender, instance, created, **kwargs):
+    if created or instance.saved_year == instance.year:
+        return
+    repository = get_match_repository()
+    for match_id in repository.ongoing_with(instance.id):
+        with repository.locked(match_id) as match:
+            if match is None or match.status != Match.StatusChoices.ONGOING or instance.id not in match.timeline_ids:
+                continue
+            match.sort_timeline()
+            match.version += 1
+            # The re-sort isn't a play: the row must hold it for the log to replay on top.
+            repository.save(match, flush=True)
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from datetime import timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Checkpoint, Occurrence, OccurrenceStats, Play
+
+CHECKPOINT = 'occurrence-stats'
+COUNTERS = ['played', 'correct', 'placed_early', 'placed_late']
+# Plays are read by id; a play committing later than a higher id is still
+# inside this window, so waiting it out keeps the checkpoint from skipping it.
+SETTLE = timedelta(seconds=10)
+
+
+def _counts(plays):
+    counts = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for occurrence_id, correct, offset in plays:
+        row = counts[occurrence_id]
+        row['played'] += 1
+        row['correct'] += correct
+        row['placed_early'] += offset < 0
+        row['placed_late'] += offset > 0
+    return counts
+
+
+def aggregate_batch(batch_size=10000, settle=SETTLE):
+    """Adds up to ``batch_size`` plays past the checkpoint into
+    ``OccurrenceStats``, stopping at the first one younger than ``settle``.
+    The checkpoint row lock keeps concurrent runs from counting a play twice.
+    Returns the number of plays read."""
+    with transaction.atomic():
+        Checkpoint.objects.get_or_create(name=CHECKPOINT)
+        checkpoint = Checkpoint.objects.select_for_update().get(name=CHECKPOINT)
+        cutoff = timezone.now() - settle
+        # played_at is set before the id, so a younger play can have the
+        # lower id; the checkpoint must not move past it.
+        plays = list(takewhile(
+            lambda play: play[-1] < cutoff,
+            Play.objects
+            .filter(id__gt=checkpoint.last_id)
+            .order_by('id')
+            .values_list('id', 'occurrence_id', 'correct', 'offset', 'played_at')[:batch_size],
+        ))
+        if not plays:
+            return 0
+        counts = _counts(play[1:-1] for play in plays)
+        languages = dict(Occurrence.objects.filter(id__in=counts).values_list('id', 'language'))
+        existing = OccurrenceStats.objects.in_bulk(list(languages))
+        rows = []
+        for occurrence_id, language in languages.items():
+            stats = existing.get(occurrence_id) or OccurrenceStats(occurrence_id=occurrence_id, language=language)
+            for counter in COUNTERS:
+                setattr(stats, counter, getattr(stats, counter) + counts[occurrence_id][counter])
+            rows.append(stats)
+        OccurrenceStats.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['occurrence'], update_fields=[*COUNTERS, 'updated_at'],
+        )
+        checkpoint.last_id = plays[-1][0]
+        checkpoint.save(update_fields=['last_id', 'updated_at'])
+    return len(plays)
+
+
+def _stats_key(lang, limit, min_played):
+    return f'occurrence-stats:{lang}:{limit}:{min_played}'
+
+
+def occurrence_stats(lang, limit=50, min_played=1):
+    """Most misplaced occurrences of ``lang`` from the precomputed rows,
+    cached for ``OCCURRENCE_STATS_CACHE_SECONDS``."""
+    key = _stats_key(lang, limit, min_played)
+    stats = cache.get(key)
+    if stats is None:
+        rows = (
+            OccurrenceStats.objects
+            .filter(language=lang, played__gte=min_played)
+            .select_related('occurrence')
+            .order_by((F('placed_early') + F('placed_late')).desc())[:limit]
+        )
+        stats = [
+            {
+                'id': row.occurrence_id,
+                'title': row.occurrence.title,
+                'year': row.occurrence.year,
+                'played': row.played,
+                'correct': row.correct,
+                'correct_ratio': row.correct / row.played if row.played else None,
+                'placed_early': row.placed_early,
+                'placed_late': row.placed_late,
+            }
+            for row in rows
+        ]
+        cache.set(key, stats, settings.OCCURRENCE_STATS_CACHE_SECONDS)
+    return stats
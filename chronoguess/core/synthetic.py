@@ -0,0 +1,114 @@
+import random
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple
+
+from .bundles import build_bundle
+from .catalog import catalog
+from .models import Match, Occurrence
+from .sampler import sampler
+from .usecases import play_occurrence, play_record
+
+FIRST_YEAR = -3000
+LAST_YEAR = 2025
+
+
+def uniform_year(rng):
+    return rng.randint(FIRST_YEAR, LAST_YEAR)
+
+
+def modern_year(rng):
+    # Most real cards are recent: half fall within ~140 years of today.
+    return max(FIRST_YEAR, LAST_YEAR - int(rng.expovariate(1 / 200)))
+
+
+def normal_year(rng):
+    return min(LAST_YEAR, max(FIRST_YEAR, int(rng.gauss(1500, 400))))
+
+
+YEAR_DISTRIBUTIONS = {
+    'uniform': uniform_year,
+    'modern': modern_year,
+    'normal': normal_year,
+}
+
+
+def year_sampler(distribution='uniform', duplicate_years=0.0, popular_years=50, rng=random):
+    """Returns ``f(rng) -> year``. A ``duplicate_years`` share of the years
+    comes from a small fixed set, so that many cards share a year."""
+    draw = YEAR_DISTRIBUTIONS[distribution]
+    popular = [draw(rng) for _ in range(popular_years)]
+
+    def sample(rng):
+        if duplicate_years and rng.random() < duplicate_years:
+            return rng.choice(popular)
+        return draw(rng)
+    return sample
+
+
+def synthetic_occurrences(count: int, lang: str, rng=random, start=0, year=uniform_year):
+    for number in range(start, start + count):
+        yield Occurrence(
+            title=f'Synthetic occurrence #{number}',
+            summary=f'Generated occurrence number {number} for scale testing.',
+            photo_url=None,
+            year=year(rng),
+            language=lang,
+        )
+
+
+def bulk_create_occurrences(objs, batch_size=5000, ignore_conflicts=False):
+    created = 0
+    batch = []
+    for obj in objs:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            Occurrence.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+            created += len(batch)
+            batch = []
+    if batch:
+        Occurrence.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        created += len(batch)
+    return created
+
+
+def refresh_loaded(languages):
+    """Refreshes what bulk_create leaves stale, as it skips the model signals:
+    the catalog cache, the sampler and the bundles of ``languages``. Returns
+    the new bundle versions by language."""
+    catalog.clear()
+    sampler.invalidate()
+    return {lang: build_bundle(lang) for lang in sorted(set(languages) & set(Occurrence.LanguageChoices.values))}
+
+
+class Card(NamedTuple):
+    id: int
+    year: int
+
+
+def synthetic_match(cards, plays: int, skill: float, rng=random):
+    """Unsaved match dealt ``cards`` (hand, timeline, then deck) after up to
+    ``plays`` plays that place the card correctly with probability ``skill``,
+    and its unsaved play log (``match_id`` to be set)."""
+    starting_hand, starting_timeline, *deck = cards
+    match = Match(
+        player_hand_ids=[starting_hand.id],
+        timeline_ids=[starting_timeline.id],
+        timeline_years=[starting_timeline.year],
+        deck_ids=[card.id for card in deck],
+        dealt_deck_ids=[card.id for card in deck],
+    )
+    by_id = {card.id: card for card in cards}
+    log = []
+    for _ in range(plays):
+        if match.status != Match.StatusChoices.ONGOING or not match.player_hand_ids:
+            break
+        card = by_id[match.player_hand_ids[0]]
+        first, last = bisect_left(match.timeline_years, card.year), bisect_right(match.timeline_years, card.year)
+        wrong = [position for position in range(len(match.timeline_years) + 1) if not first <= position <= last]
+        if wrong and rng.random() >= skill:
+            position = rng.choice(wrong)
+        else:
+            position = rng.randint(first, last)
+        log.append(play_record(match, card, position, play_occurrence(match, card, position)))
+    return match, log
+
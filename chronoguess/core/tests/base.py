@@ -0,0 +1,38 @@
+from django.test import Client, override_settings
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Match
+from chronoguess.core.repositories import get_match_repository
+
+
+def cached_store(**settings):
+    """Plays matches through CacheMatchRepository on the locmem store."""
+    return override_settings(
+        MATCH_REPOSITORY="chronoguess.core.repositories.CacheMatchRepository",
+        # The locmem store is only shared within one process.
+        GUNICORN_WORKERS=1,
+        **settings,
+    )
+
+
+class PlayMixin:
+    """An empty catalog cache and a fresh client for each test, and plays
+    through the API."""
+
+    def setUp(self):
+        super().setUp()
+        catalog.clear()
+        self.client = Client()
+
+    def play(self, match_id, position=0, occurrence_id=None, query="", **extra):
+        """Plays ``occurrence_id``, by default the first card in the hand, at
+        ``position``."""
+        if occurrence_id is None:
+            occurrence_id = get_match_repository().get(match_id).player_hand_ids[0]
+        return self.client.post(f'/api/match/{match_id}/{query}', content_type='application/json', data={
+            "occurrence_id": occurrence_id,
+            "position": position,
+        }, **extra)
+
+    def make_first_slot_wrong(self, match_id, **fields):
+        # Every card is later than the timeline card, so position 0 is wrong.
+        Match.objects.filter(id=match_id).update(timeline_years=[-100000], **fields)
@@ -0,0 +1,95 @@
+from django.test import TestCase
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Match, Play
+from chronoguess.core.tests.base import PlayMixin
+from chronoguess.core.usecases import new_match
+
+
+class BatchPlayTestCase(PlayMixin, TestCase):
+
+    def draw_order(self, match_id):
+        match = Match.objects.get(id=match_id)
+        return match.player_hand_ids + match.deck_ids
+
+    def post(self, match_id, plays):
+        return self.client.post(f'/api/match/{match_id}/plays/', content_type='application/json', data={"plays": plays})
+
+    def test_plays_in_order(self):
+        match = new_match(lang="en")
+        cards = self.draw_order(match["id"])[:3]
+
+        response = self.post(match["id"], [{"occurrence_id": card, "position": 0} for card in cards])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["results"]), 3)
+        self.assertEqual(len(data["match"]["timeline"]) + len(data["match"]["mistakes"]), 4)
+        self.assertEqual(data["match"], self.client.get(f'/api/match/{match["id"]}/').json())
+        self.assertEqual(Match.objects.get(id=match["id"]).version, 4)
+
+    def test_stops_when_match_is_lost(self):
+        match = new_match(lang="en")
+        self.make_first_slot_wrong(match["id"], remaining_life=2)
+        cards = self.draw_order(match["id"])
+
+        response = self.post(match["id"], [{"occurrence_id": card, "position": 0} for card in cards[:5]])
+
+        data = response.json()
+        self.assertEqual(data["results"], ["incorrect", "incorrect"])
+        self.assertEqual(data["match"]["status"], "lose")
+
+    def test_invalid_play_rolls_back(self):
+        match = new_match(lang="en")
+        cards = self.draw_order(match["id"])
+
+        response = self.post(match["id"], [
+            {"occurrence_id": cards[0], "position": 0},
+            {"occurrence_id": cards[5], "position": 0},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(response.json(), {"error": "Play 1: Occurrence not in player's hand"})
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/').json(), match)
+
+    def test_single_save_per_batch(self):
+        match = new_match(lang="en")
+        cards = self.draw_order(match["id"])[:5]
+        catalog.get_many(cards)
+
+        # SAVEPOINT, locked SELECT, one UPDATE, one play log INSERT, one
+        # NOTIFY, RELEASE.
+        with self.assertNumQueries(6):
+            self.post(match["id"], [{"occurrence_id": card, "position": 0} for card in cards])
+
+    def test_invalid_payload(self):
+        match = new_match(lang="en")
+
+        for plays in (None, [{"occurrence_id": "1"}], [{"position": 0}]):
+            with self.subTest(plays=plays):
+                self.assertEqual(self.post(match["id"], plays).status_code, 400)
+
+    def test_not_found(self):
+        self.assertEqual(self.post(1, []).status_code, 404)
+
+    def test_single_play_on_finished_match(self):
+        match = new_match(lang="en")
+        Match.objects.filter(id=match["id"]).update(status=Match.StatusChoices.LOSE, remaining_life=0)
+
+        response = self.client.post(f'/api/match/{match["id"]}/', content_type='application/json', data={
+            "occurrence_id": match["player_hand"][0]["id"],
+            "position": 0,
+        })
+
+        self.assertEqual(response.status_code, 400)
+        row = Match.objects.get(id=match["id"])
+        self.assertEqual((row.status, row.version), (Match.StatusChoices.LOSE, 1))
+        self.assertFalse(Play.objects.filter(match_id=match["id"]).exists())
+
+    def test_single_play_invalid_payload(self):
+        match = new_match(lang="en")
+
+        card = match["player_hand"][0]["id"]
+
+        for data in ([], {"position": 0}, {"occurrence_id": card}, {"occurrence_id": str(card), "position": 0}):
+            response = self.client.post(f'/api/match/{match["id"]}/', content_type='application/json', data=data)
+            self.assertEqual(response.status_code, 400)
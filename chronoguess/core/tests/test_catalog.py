@@ -0,0 +1,60 @@
+from django.test import TestCase, Client, override_settings
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Occurrence
+
+
+class CatalogTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+
+    def test_read_through(self):
+        occurrence = Occurrence.objects.filter(language="en").first()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(catalog.get(occurrence.id), occurrence)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get(occurrence.id).title, occurrence.title)
+
+    def test_language_ids(self):
+        ids = list(Occurrence.objects.filter(language="pt-br").order_by("id").values_list("id", flat=True))
+
+        self.assertEqual(catalog.language_ids("pt-br"), ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.language_ids("pt-br"), ids)
+
+    def test_invalidated_on_save(self):
+        occurrence = Occurrence.objects.filter(language="en").first()
+        catalog.get(occurrence.id)
+
+        occurrence.year = 1234
+        occurrence.save()
+
+        self.assertEqual(catalog.get(occurrence.id).year, 1234)
+
+    def test_invalidated_on_create_and_delete(self):
+        before = catalog.language_ids("en")
+        occurrence = Occurrence.objects.create(title="New card", summary="New card", year=2000, language="en")
+        self.assertEqual(catalog.language_ids("en"), before + [occurrence.id])
+
+        occurrence_id = occurrence.id
+        occurrence.delete()
+        self.assertEqual(catalog.language_ids("en"), before)
+        self.assertIsNone(catalog.get(occurrence_id))
+
+    @override_settings(INTERNAL_ENDPOINTS_ENABLED=True)
+    def test_stats(self):
+        occurrence = Occurrence.objects.filter(language="en").first()
+        hits, misses = catalog.hits, catalog.misses
+        catalog.get(occurrence.id)
+        catalog.get(occurrence.id)
+
+        response = Client().get('/api/_catalog/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["hits"], hits + 1)
+        self.assertEqual(response.json()["misses"], misses + 1)
+
+    def test_stats_are_internal(self):
+        self.assertEqual(Client().get('/api/_catalog/').status_code, 404)
+        with override_settings(INTERNAL_ENDPOINTS_ENABLED=True):
+            self.assertEqual(Client(REMOTE_ADDR="203.0.113.7").get('/api/_catalog/').status_code, 404)
@@ -0,0 +1,160 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from chronoguess.core.bundles import build_bundle, bundle_url, current_version
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import CatalogBundle, Match, Occurrence
+from chronoguess.core.usecases import new_match
+
+
+class CatalogBundleTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+        self.client = Client()
+
+    def bundle(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_bundle_holds_every_occurrence_without_years(self):
+        version = build_bundle("en")
+
+        response = self.client.get(bundle_url("en", version), HTTP_ACCEPT_ENCODING="gzip")
+        bundle = json.loads(gzip.decompress(response.content))
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(
+            [occurrence["id"] for occurrence in bundle["occurrences"]],
+            list(Occurrence.objects.filter(language="en").order_by("id").values_list("id", flat=True)),
+        )
+        self.assertNotIn("year", bundle["occurrences"][0])
+        self.assertEqual(self.bundle(bundle_url("en", version)), bundle)
+
+    def test_version_changes_with_the_catalog(self):
+        version = build_bundle("en")
+        self.assertEqual(build_bundle("en"), version)
+
+        Occurrence.objects.filter(language="en").update(title="Renamed")
+        changed = build_bundle("en")
+
+        self.assertNotEqual(changed, version)
+        self.assertEqual(current_version("en"), changed)
+        # Clients still holding the old version get the old content.
+        self.assertNotEqual(self.bundle(bundle_url("en", version)), self.bundle(bundle_url("en", changed)))
+
+    def test_not_modified_and_unknown_versions(self):
+        version = build_bundle("en")
+
+        response = self.client.get(bundle_url("en", version), HTTP_IF_NONE_MATCH=f'"{version}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(bundle_url("en", "0" * 16)).status_code, 404)
+        self.assertEqual(self.client.get(f"/api/catalog/xx/{version}.json").status_code, 404)
+
+    def test_partial_bundle(self):
+        version = build_bundle("en")
+        ids = list(Occurrence.objects.filter(language="en").values_list("id", flat=True)[:2])
+        other = Occurrence.objects.filter(language="pt-br").first()
+
+        bundle = self.bundle(f"{bundle_url('en', version)}?ids={ids[0]},{ids[1]},{other.id}")
+
+        self.assertEqual([occurrence["id"] for occurrence in bundle["occurrences"]], sorted(ids))
+        self.assertEqual(self.client.get(f"{bundle_url('en', version)}?ids=a").status_code, 400)
+        self.assertEqual(self.client.get(f"{bundle_url('en', '0' * 16)}?ids={ids[0]}").status_code, 404)
+
+    def test_partial_bundle_of_older_version(self):
+        version = build_bundle("en")
+        occurrence = Occurrence.objects.filter(language="en").first()
+        Occurrence.objects.filter(id=occurrence.id).update(title="Renamed")
+        build_bundle("en")
+
+        bundle = self.bundle(f"{bundle_url('en', version)}?ids={occurrence.id}")
+
+        self.assertEqual([entry["id"] for entry in bundle["occurrences"]], [occurrence.id])
+
+    def test_load_occurrences_rebuilds_the_bundle(self):
+        version = build_bundle("en")
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as file:
+            file.write('title,summary,photo_url,year,lang\nMoon landing,Apollo 11,,1969,en\n')
+            file.flush()
+            call_command("load_occurrences", file.name, stdout=StringIO())
+
+        bundle = self.bundle(bundle_url("en", current_version("en")))
+
+        self.assertNotEqual(current_version("en"), version)
+        self.assertIn("Moon landing", [occurrence["title"] for occurrence in bundle["occurrences"]])
+        self.assertEqual(CatalogBundle.objects.filter(language="en").count(), 2)
+
+
+class CompactMatchTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+        self.client = Client()
+
+    def test_compact_match_resolves_through_the_bundle(self):
+        match = new_match(lang="en")
+
+        compact = self.client.get(f'/api/match/{match["id"]}/?format=compact').json()
+        bundle = {
+            occurrence["id"]: occurrence for occurrence in self.client.get(compact["catalog"]).json()["occurrences"]
+        }
+
+        self.assertEqual(
+            [bundle[id] for id in compact["player_hand"]],
+            [{key: card[key] for key in bundle[card["id"]]} for card in match["player_hand"]],
+        )
+        self.assertEqual(compact["timeline"], [{"id": card["id"], "year": card["year"]} for card in match["timeline"]])
+        self.assertEqual(compact["mistakes"], [])
+
+    def test_compact_match_after_its_first_timeline_card_is_deleted(self):
+        match = new_match(lang="en")
+        row = Match.objects.get(id=match["id"])
+        dealt = [*row.timeline_ids, *row.player_hand_ids, *row.deck_ids]
+        extra = Occurrence.objects.filter(language="en").exclude(id__in=dealt).first()
+        Match.objects.filter(id=row.id).update(
+            timeline_ids=[extra.id, *row.timeline_ids], timeline_years=[extra.year, *row.timeline_years],
+        )
+        extra.delete()
+
+        response = self.client.get(f'/api/match/{match["id"]}/?format=compact')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["catalog"], bundle_url("en", current_version("en")))
+
+    def test_requests_never_build_the_bundle(self):
+        CatalogBundle.objects.all().delete()
+        match = new_match(lang="en")
+
+        compact = self.client.get(f'/api/match/{match["id"]}/?format=compact').json()
+
+        self.assertIsNone(compact["catalog"])
+        self.assertFalse(CatalogBundle.objects.exists())
+        self.assertIsNone(current_version("en"))
+
+    def test_compact_play_and_etag(self):
+        match = new_match(lang="en")
+        row = Match.objects.get(id=match["id"])
+        year = catalog.get(row.player_hand_ids[0]).year
+        # The first slot is wrong for cards after the timeline, the last otherwise.
+        position = 0 if year > row.timeline_years[0] else 1
+
+        response = self.client.post(
+            f'/api/match/{match["id"]}/', content_type='application/json',
+            data={"occurrence_id": row.player_hand_ids[0], "position": position},
+            HTTP_ACCEPT="application/vnd.chronoguess.compact+json",
+        )
+        played = response.json()
+
+        self.assertEqual(played["status"], "incorrect")
+        self.assertEqual(played["match"]["mistakes"], [{"id": row.player_hand_ids[0], "year": year}])
+        self.assertEqual(response["ETag"], f'"{match["id"]}-2-compact"')
+        detail = self.client.get(f'/api/match/{match["id"]}/?format=compact', HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(detail.status_code, 304)
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/', HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+from chronoguess.core.models import Game, Match, MatchArchive, Play
+from chronoguess.core.tests.base import PlayMixin, cached_store
+from chronoguess.core.usecases import new_match
+
+
+class CompactMatchesTestCase(PlayMixin, TestCase):
+
+    def match(self, status, days_ago):
+        match = Match.objects.get(id=new_match(lang="pt-br")["id"])
+        Match.objects.filter(id=match.id).update(status=status, updated_at=timezone.now() - timedelta(days=days_ago))
+        return match
+
+    def compact(self):
+        stdout = StringIO()
+        call_command("compact_matches", "--pause", "0", "--batch-size", "1", stdout=stdout)
+        return stdout.getvalue()
+
+    def test_archives_old_matches(self):
+        lost = self.match(Match.StatusChoices.LOSE, days_ago=2)
+        abandoned = self.match(Match.StatusChoices.ONGOING, days_ago=8)
+
+        output = self.compact()
+
+        self.assertIn("Archived 2 matches, deleted 2 games and 28 deck rows", output)
+        self.assertFalse(Match.objects.filter(id__in=[lost.id, abandoned.id]).exists())
+        self.assertFalse(Game.objects.filter(id__in=[lost.game_id, abandoned.game_id]).exists())
+        archive = MatchArchive.objects.get(match_id=lost.id)
+        self.assertEqual(archive.status, "lose")
+        self.assertEqual(archive.language, "pt-br")
+        self.assertEqual(archive.timeline_ids, lost.timeline_ids)
+        self.assertEqual(MatchArchive.objects.get(match_id=abandoned.id).status, "abandoned")
+
+    def test_keeps_recent_matches(self):
+        won = self.match(Match.StatusChoices.WIN, days_ago=0)
+        ongoing = self.match(Match.StatusChoices.ONGOING, days_ago=2)
+
+        self.assertIn("Archived 0 matches", self.compact())
+        self.assertEqual(Match.objects.filter(id__in=[won.id, ongoing.id]).count(), 2)
+        self.assertFalse(MatchArchive.objects.exists())
+
+    @cached_store(MATCH_STORE_FLUSH_EVERY=100, MATCH_EVENT_BROKER="chronoguess.core.events.InProcessBroker")
+    def test_keeps_match_played_since_last_flush(self):
+        caches["match_store"].clear()
+        match = new_match(lang="pt-br")
+        self.play(match["id"])
+        # The row was written a week ago; the play since only reached the cache.
+        Match.objects.filter(id=match["id"]).update(updated_at=timezone.now() - timedelta(days=8))
+
+        self.assertIn("Archived 0 matches", self.compact())
+        self.assertGreater(Match.objects.get(id=match["id"]).updated_at, timezone.now() - timedelta(days=1))
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/')["ETag"], f'"{match["id"]}-2"')
+
+    @cached_store(MATCH_STORE_FLUSH_EVERY=100, MATCH_EVENT_BROKER="chronoguess.core.events.InProcessBroker")
+    def test_archives_plays_not_yet_on_the_row(self):
+        caches["match_store"].clear()
+        match = new_match(lang="pt-br")
+        played = match["player_hand"][0]["id"]
+        self.play(match["id"])
+        week_ago = timezone.now() - timedelta(days=8)
+        Match.objects.filter(id=match["id"]).update(updated_at=week_ago)
+        Play.objects.filter(match_id=match["id"]).update(played_at=week_ago)
+        # Evicted from the store before the play reached the row.
+        caches["match_store"].clear()
+
+        self.assertIn("Archived 1 matches", self.compact())
+        archive = MatchArchive.objects.get(match_id=match["id"])
+        self.assertIn(played, archive.timeline_ids + archive.mistake_ids)
+        self.assertEqual(archive.last_played_at, week_ago)
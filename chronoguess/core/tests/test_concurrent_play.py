@@ -0,0 +1,83 @@
+import threading
+
+from django.db import connection
+from django.core.cache import caches
+from django.test import TransactionTestCase, Client
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Match, Occurrence
+from chronoguess.core.sampler import sampler
+from chronoguess.core.tests.base import cached_store
+from chronoguess.core.usecases import DEAL_SIZE, new_match
+
+PLAYERS = 8
+
+
+class ConcurrentPlayTestCase(TransactionTestCase):
+    # Real transactions, so parallel requests contend for the match row lock.
+
+    def setUp(self):
+        catalog.clear()
+        sampler.invalidate()
+        caches["match_store"].clear()
+        Occurrence.objects.bulk_create(
+            Occurrence(title=f"Card {index}", summary="", year=1900 + index, language="en")
+            for index in range(40)
+        )
+
+    def play_concurrently(self, match_id):
+        barrier = threading.Barrier(PLAYERS)
+        statuses = []
+
+        def player():
+            client = Client()
+            try:
+                for _ in range(DEAL_SIZE):
+                    match = client.get(f'/api/match/{match_id}/').json()
+                    if match["status"] != "ongoing":
+                        break
+                    barrier.wait(timeout=10)
+                    response = client.post(f'/api/match/{match_id}/', content_type='application/json', data={
+                        "occurrence_id": match["player_hand"][0]["id"],
+                        "position": 0,
+                    })
+                    statuses.append(response.status_code)
+            except threading.BrokenBarrierError:
+                pass
+            finally:
+                barrier.abort()
+                connection.close()
+
+        threads = [threading.Thread(target=player) for _ in range(PLAYERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def test_parallel_plays_keep_match_consistent(self):
+        match_id = new_match(lang="en")["id"]
+
+        statuses = self.play_concurrently(match_id)
+
+        self.assert_consistent(Match.objects.get(id=match_id), statuses)
+
+    @cached_store(MATCH_STORE_FLUSH_EVERY=1)
+    def test_parallel_plays_on_cached_match(self):
+        match_id = new_match(lang="en")["id"]
+
+        statuses = self.play_concurrently(match_id)
+
+        self.assert_consistent(Match.objects.get(id=match_id), statuses)
+
+    def assert_consistent(self, match, statuses):
+        piles = match.timeline_ids + match.player_hand_ids + match.deck_ids + match.mistake_ids
+        accepted = statuses.count(200)
+        self.assertGreater(accepted, 0)
+        self.assertEqual(set(statuses) - {200, 400}, set())
+        self.assertEqual(len(piles), len(set(piles)))
+        self.assertEqual(len(match.mistake_ids), 3 - match.remaining_life)
+        self.assertEqual(accepted, len(match.timeline_ids) - 1 + len(match.mistake_ids))
+        if match.status == Match.StatusChoices.ONGOING:
+            self.assertEqual(len(piles), DEAL_SIZE)
+            self.assertEqual(len(match.player_hand_ids), 1)
+        self.assertEqual(match.timeline_years, sorted(match.timeline_years))
@@ -1,8 +1,12 @@
 from django.test import TestCase, Client
 from chronoguess.core.usecases import new_match
+from chronoguess.core.catalog import catalog
 
 class CreateMatchTestCase(TestCase):
 
+    def setUp(self):
+        catalog.clear()
+
     def test_success(self):
         client = Client()
     
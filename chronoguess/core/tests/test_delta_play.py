@@ -0,0 +1,95 @@
+from bisect import bisect_left
+
+from django.test import TestCase
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Match
+from chronoguess.core.tests.base import PlayMixin
+from chronoguess.core.usecases import new_match
+
+
+def apply_delta(match, event):
+    # What a client does with a delta: move the played card out of its hand.
+    hand = [card for card in match["player_hand"] if card["id"] != event["played"]["id"]]
+    played = next(card for card in match["player_hand"] if card["id"] == event["played"]["id"])
+    played = {**played, "year": event["played"]["year"]}
+    timeline, mistakes = list(match["timeline"]), list(match["mistakes"])
+    if event["result"] == "correct":
+        timeline.insert(event["position"], played)
+    else:
+        mistakes.append(played)
+    if event["drawn"]:
+        hand.append(event["drawn"])
+    return {
+        **match,
+        "player_hand": hand if event["status"] != "win" else [],
+        "timeline": timeline,
+        "mistakes": mistakes,
+        "remaining_life": event["remaining_life"],
+        "status": event["status"],
+    }
+
+
+class DeltaPlayTestCase(PlayMixin, TestCase):
+
+    def test_delta_rebuilds_full_match(self):
+        match = new_match(lang="en")
+
+        for correct in (True, False, True, False):
+            hand_id = match["player_hand"][0]["id"]
+            years = [card["year"] for card in match["timeline"]]
+            first = bisect_left(years, catalog.get(hand_id).year)
+            # Two mistakes at most, so the match is still ongoing at every play.
+            position = first if correct else (0 if first else len(years))
+            response = self.play(match["id"], position, hand_id, query="?format=delta")
+            self.assertEqual(response.status_code, 200)
+            event = response.json()
+            match = apply_delta(match, event)
+
+            self.assertEqual(match, self.client.get(f'/api/match/{match["id"]}/').json())
+            self.assertEqual(response["ETag"], f'"{match["id"]}-{event["version"]}"')
+
+    def test_delta_by_accept_header(self):
+        match = new_match(lang="en")
+
+        response = self.play(match["id"], HTTP_ACCEPT="application/vnd.chronoguess.delta+json")
+
+        self.assertEqual(set(response.json()), {
+            "version", "result", "played", "position", "drawn", "remaining_life", "status",
+        })
+
+    def test_full_match_is_default(self):
+        match = new_match(lang="en")
+
+        response = self.play(match["id"])
+
+        self.assertEqual(set(response.json()), {"status", "match"})
+
+    def test_delta_size_does_not_depend_on_timeline_size(self):
+        match = new_match(lang="en")
+        sizes = []
+        for _ in range(6):
+            row = Match.objects.get(id=match["id"])
+            hand_id = row.player_hand_ids[0]
+            # Correct plays grow the timeline without ending the match.
+            position = bisect_left(row.timeline_years, catalog.get(hand_id).year)
+            response = self.play(match["id"], position, hand_id, query="?format=delta")
+            self.assertEqual(response.json()["result"], "correct")
+            sizes.append(len(response.content))
+
+        self.assertLess(max(sizes) - min(sizes), 40)
+
+    def test_batch_delta(self):
+        match = new_match(lang="en")
+        row = Match.objects.get(id=match["id"])
+        cards = row.player_hand_ids + row.deck_ids[:2]
+
+        response = self.client.post(
+            f'/api/match/{match["id"]}/plays/?format=delta', content_type='application/json',
+            data={"plays": [{"occurrence_id": card, "position": 0} for card in cards]},
+        )
+
+        data = response.json()
+        self.assertEqual(data["version"], 4)
+        for event in data["events"]:
+            match = apply_delta(match, event)
+        self.assertEqual(match, self.client.get(f'/api/match/{match["id"]}/').json())
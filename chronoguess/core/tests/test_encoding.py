@@ -0,0 +1,42 @@
+import json
+
+from django.test import TestCase, override_settings
+from chronoguess.core import encoding
+from chronoguess.core.catalog import catalog
+from chronoguess.core.encoding import fragments, match_json, play_json
+from chronoguess.core.models import Occurrence
+from chronoguess.core.usecases import get_match_by_id, new_match
+
+
+class EncodingTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+        fragments.clear()
+
+    def test_match_json_matches_as_dict(self):
+        match = get_match_by_id(new_match(lang="pt-br")["id"], as_dict=False)
+
+        for name in ("json", "orjson") if encoding.orjson else ("json",):
+            with self.subTest(encoder=name), override_settings(JSON_ENCODER=name):
+                fragments.clear()
+                self.assertEqual(json.loads(match_json(match)), match.as_dict())
+                self.assertEqual(
+                    json.loads(play_json("correct", match)), {"status": "correct", "match": match.as_dict()},
+                )
+
+    def test_edited_occurrence_is_reencoded(self):
+        match = get_match_by_id(new_match(lang="en")["id"], as_dict=False)
+        match_json(match)
+
+        occurrence = Occurrence.objects.get(id=match.timeline_ids[0])
+        occurrence.title = "Renamed"
+        occurrence.save()
+        match = get_match_by_id(match.id, as_dict=False)
+
+        self.assertEqual(json.loads(match_json(match))["timeline"][0]["title"], "Renamed")
+
+    @override_settings(JSON_ENCODER="yaml")
+    def test_unknown_encoder(self):
+        with self.assertRaises(ValueError):
+            encoding.dumps({})
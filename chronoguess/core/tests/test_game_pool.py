@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from chronoguess.core import pool
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Game, Match
+from chronoguess.core.usecases import new_match
+
+
+@override_settings(GAME_POOL_SIZE=2)
+class GamePoolTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+
+    def fill(self, *args):
+        call_command("fill_game_pool", "--lang", "en", *args, stdout=StringIO())
+
+    def test_fill_tops_up_to_size(self):
+        self.fill()
+        self.fill("--size", "3")
+
+        self.assertEqual(pool.depth("en"), 3)
+        self.assertEqual(pool.depth("pt-br"), 0)
+        game = Game.objects.filter(pooled=True).first()
+        self.assertEqual(game.language, "en")
+        self.assertEqual(game.deck.count(), 14)
+
+    def test_match_claims_pooled_game(self):
+        self.fill()
+
+        response = Client().get('/api/match/')
+
+        self.assertEqual(response.status_code, 200)
+        match = Match.objects.get(id=response.json()["id"])
+        self.assertFalse(match.game.pooled)
+        self.assertEqual(pool.depth("en"), 1)
+        self.assertEqual(match.player_hand_ids, [match.game.starting_hand_id])
+        self.assertEqual(match.timeline_ids, [match.game.starting_timeline_id])
+        self.assertCountEqual(match.deck_ids, match.game.deck.values_list('id', flat=True))
+
+    def test_claim_query_budget(self):
+        self.fill()
+        catalog.get_many(Game.objects.values_list('starting_hand_id', 'starting_timeline_id').first())
+
+        with self.assertNumQueries(6):
+            Client().get('/api/match/')
+
+    def test_empty_pool_deals_in_request(self):
+        self.fill()
+
+        match = new_match(lang="pt-br")
+
+        self.assertEqual(len(match["player_hand"]), 1)
+        self.assertEqual(Match.objects.get(id=match["id"]).game.language, "pt-br")
+        self.assertEqual(pool.depth("en"), 2)
+
+    @override_settings(INTERNAL_ENDPOINTS_ENABLED=True)
+    def test_depth_metric(self):
+        self.fill()
+
+        content = Client().get('/api/_metrics').content.decode()
+
+        self.assertIn('chronoguess_game_pool_depth{language="en"} 2', content)
+        self.assertIn('chronoguess_game_pool_depth{language="pt-br"} 0', content)
@@ -0,0 +1,42 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from chronoguess.core.catalog import catalog
+from chronoguess.core.history import rebuild_match
+from chronoguess.core.models import Match, Occurrence, Play
+from chronoguess.core.usecases import DEAL_SIZE
+
+
+class GenerateTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+
+    def test_generate_catalog(self):
+        before = Occurrence.objects.filter(language="en").count()
+
+        call_command(
+            "generate_catalog", "--count", "200", "--lang", "en", "--duplicate-years", "1", "--seed", "1",
+            stdout=StringIO(),
+        )
+
+        generated = Occurrence.objects.filter(language="en", title__startswith="Synthetic")
+        self.assertEqual(generated.count(), 200)
+        self.assertEqual(Occurrence.objects.filter(language="en").count(), before + 200)
+        self.assertLessEqual(generated.values('year').distinct().count(), 50)
+
+    def test_generate_matches(self):
+        call_command("generate_matches", "--count", "30", "--lang", "pt-br", "--seed", "1", stdout=StringIO())
+
+        matches = Match.objects.filter(game__language="pt-br")
+        self.assertEqual(matches.count(), 30)
+        for match in matches:
+            piles = match.timeline_ids + match.player_hand_ids + match.deck_ids + match.mistake_ids
+            self.assertEqual(len(piles), len(set(piles)))
+            self.assertEqual(match.timeline_years, sorted(match.timeline_years))
+            self.assertEqual(len(match.mistake_ids), 3 - match.remaining_life)
+            self.assertEqual(match.game.deck.count(), DEAL_SIZE - 2)
+            self.assertLessEqual(match.created_at, match.updated_at)
+            self.assertEqual(Play.objects.filter(match_id=match.id).count(), match.version - 1)
+            self.assertEqual(rebuild_match(match.id).mistake_ids, match.mistake_ids)
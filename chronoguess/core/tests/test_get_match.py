@@ -1,8 +1,14 @@
-from django.test import TestCase, Client
-from chronoguess.core.usecases import new_match
+from django.core.cache import caches
+from django.test import TestCase, Client, AsyncClient, override_settings
+from chronoguess.core.usecases import new_match, anew_match
+from chronoguess.core.catalog import catalog
+from chronoguess.core.tests.base import PlayMixin
 
 class GetMatchTestCase(TestCase):
 
+    def setUp(self):
+        catalog.clear()
+
     def test_success(self):
         match = new_match(lang="en")
         client = Client()
@@ -18,5 +24,56 @@ class GetMatchTestCase(TestCase):
         client = Client()
         response = client.get('/api/match/1/')
         self.assertEqual(response.status_code, 404)
-    
 
+    async def test_success_async(self):
+        match = await anew_match(lang="en")
+
+        response = await AsyncClient().get(f'/api/match/{match["id"]}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(match, response.json())
+
+
+class ConditionalGetMatchTestCase(PlayMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+
+    def test_not_modified(self):
+        match = new_match(lang="en")
+        client = Client()
+        etag = client.get(f'/api/match/{match["id"]}/').headers["ETag"]
+
+        with self.assertNumQueries(1):
+            response = client.get(f'/api/match/{match["id"]}/', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+
+    @override_settings(MATCH_VERSION_CACHE_ALIAS="default")
+    def test_not_modified_from_cache(self):
+        match = new_match(lang="en")
+        client = Client()
+        etag = client.get(f'/api/match/{match["id"]}/').headers["ETag"]
+
+        with self.assertNumQueries(0):
+            response = client.get(f'/api/match/{match["id"]}/', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(MATCH_VERSION_CACHE_ALIAS="default")
+    def test_play_changes_etag(self):
+        match = new_match(lang="en")
+        etag = self.client.get(f'/api/match/{match["id"]}/').headers["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            played = self.play(match["id"])
+        response = self.client.get(f'/api/match/{match["id"]}/', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.headers["ETag"], played.headers["ETag"])
+
+    def test_not_found(self):
+        response = Client().get('/api/match/1/', headers={"If-None-Match": '"1-1"'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,64 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from chronoguess.core.models import Occurrence
+
+
+class LoadOccurrencesTestCase(TestCase):
+
+    def load(self, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as file:
+            file.write(content)
+            file.flush()
+            stdout = StringIO()
+            call_command("load_occurrences", file.name, *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_summary_with_commas(self):
+        self.load(
+            'title,summary,photo_url,year,lang\n'
+            'Moon landing,"Apollo 11 lands, Armstrong walks",https://example.com/moon.jpg,1969,en\n'
+        )
+
+        occurrence = Occurrence.objects.get(title="Moon landing")
+        self.assertEqual(occurrence.summary, "Apollo 11 lands, Armstrong walks")
+        self.assertEqual(occurrence.year, 1969)
+
+    def test_dedupes_on_natural_key(self):
+        content = (
+            'title,summary,photo_url,year,lang\n'
+            'Moon landing,Apollo 11,,1969,en\n'
+            'Moon landing,Apollo 11 again,,1969,en\n'
+            'Moon landing,Apollo 11,,1969,pt-br\n'
+            'Broken row,1969,en\n'
+        )
+        self.load(content, "--batch-size", "2")
+        self.load(content)
+
+        self.assertEqual(Occurrence.objects.filter(title="Moon landing").count(), 2)
+        self.assertFalse(Occurrence.objects.filter(title="Broken row").exists())
+
+    def test_dry_run(self):
+        self.load(
+            'title,summary,photo_url,year,lang\n'
+            'Moon landing,Apollo 11,,1969,en\n',
+            "--dry-run",
+        )
+
+        self.assertFalse(Occurrence.objects.filter(title="Moon landing").exists())
+
+    def test_dry_run_dedupes_across_batches_and_the_catalog(self):
+        self.load('title,summary,photo_url,year,lang\nMoon landing,Apollo 11,,1969,en\n')
+
+        output = self.load(
+            'title,summary,photo_url,year,lang\n'
+            'Moon landing,Apollo 11,,1969,en\n'
+            'Mars landing,Viking 1,,1976,en\n'
+            'Mars landing,Viking 1 again,,1976,en\n'
+            'Mars landing,Viking 1,,1976,pt-br\n',
+            "--dry-run", "--batch-size", "1",
+        )
+
+        self.assertIn("Would create 2 of 4 occurrences", output)
@@ -0,0 +1,133 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, TransactionTestCase, override_settings
+from chronoguess.core.catalog import catalog
+from chronoguess.core.events import PostgresBroker, get_event_broker
+from chronoguess.core.models import Match, Occurrence
+from chronoguess.core.sampler import sampler
+from chronoguess.core.usecases import MAX_BATCH_PLAYS, new_match, submit_occurence_on_match, submit_plays_on_match
+
+IN_PROCESS = "chronoguess.core.events.InProcessBroker"
+
+
+@override_settings(MATCH_EVENT_BROKER=IN_PROCESS)
+class MatchEventsTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+        self.match = new_match(lang="en", as_dict=False)
+
+    def published(self, play):
+        with mock.patch.object(get_event_broker(), "deliver") as deliver:
+            with self.captureOnCommitCallbacks(execute=True):
+                play()
+        deliver.assert_called_once()
+        match_id, events = deliver.call_args.args
+        self.assertEqual(match_id, self.match.id)
+        return events
+
+    def test_play_publishes_event_on_commit(self):
+        card = self.match.player_hand_ids[0]
+        drawn = self.match.deck_ids[0]
+
+        [event] = self.published(lambda: submit_occurence_on_match(self.match.id, card, 0))
+
+        match = Match.objects.get(id=self.match.id)
+        self.assertEqual(event["version"], match.version)
+        self.assertEqual(event["played"]["id"], card)
+        self.assertEqual(event["drawn"], catalog.get(drawn).as_dict(hide_year=True))
+        self.assertEqual(event["remaining_life"], match.remaining_life)
+        self.assertEqual(event["status"], "ongoing")
+        self.assertEqual(event["position"], 0 if event["result"] == "correct" else None)
+
+    def test_batch_publishes_one_event_per_play(self):
+        cards = self.match.player_hand_ids + self.match.deck_ids[:2]
+
+        events = self.published(lambda: submit_plays_on_match(
+            self.match.id, [{"occurrence_id": card, "position": 0} for card in cards],
+        ))
+
+        self.assertEqual([event["played"]["id"] for event in events], cards)
+        self.assertEqual([event["version"] for event in events], [2, 3, 4])
+        self.assertEqual([event["drawn"]["id"] for event in events], self.match.deck_ids[:3])
+
+    async def test_stream_sends_ready_then_plays(self):
+        response = await self.async_client.get(f"/api/match/{self.match.id}/events/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+
+        ready = await anext(content)
+        self.assertEqual(ready, b'id: 1\nevent: ready\ndata: {"version":1,"status":"ongoing"}\n\n')
+
+        get_event_broker().deliver(self.match.id, [
+            {"version": 1, "status": "ongoing"},
+            {"version": 2, "status": "ongoing"},
+            {"version": 3, "status": "lose"},
+        ])
+        self.assertEqual(await anext(content), b'id: 2\nevent: play\ndata: {"version":2,"status":"ongoing"}\n\n')
+        self.assertEqual(await anext(content), b'id: 3\nevent: play\ndata: {"version":3,"status":"lose"}\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(content)
+        self.assertEqual(get_event_broker().subscriber_count(), 0)
+
+    @override_settings(MATCH_EVENTS_KEEPALIVE=0.01)
+    async def test_idle_stream_sends_keep_alive(self):
+        response = await self.async_client.get(f"/api/match/{self.match.id}/events/")
+        content = aiter(response.streaming_content)
+        await anext(content)
+
+        self.assertEqual(await anext(content), b": keep-alive\n\n")
+        get_event_broker().deliver(self.match.id, [{"version": 2, "status": "win"}])
+        self.assertIn(b"event: play", await anext(content))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(content)
+
+    def test_not_found(self):
+        response = self.client.get("/api/match/0/events/")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class PostgresBrokerTestCase(TransactionTestCase):
+    # NOTIFY is only delivered on commit, so this needs real transactions.
+
+    async def test_notify_reaches_subscribers(self):
+        broker = PostgresBroker()
+        try:
+            async with broker.subscribe(7) as queue:
+                await sync_to_async(broker.publish)(7, [{"version": 2}])
+                await sync_to_async(broker.publish)(8, [{"version": 5}])
+
+                self.assertEqual(await asyncio.wait_for(queue.get(), 5), [{"version": 2}])
+                await asyncio.sleep(0.05)
+                self.assertTrue(queue.empty())
+        finally:
+            await broker.stop()
+
+    async def test_long_summaries_fit_the_payload(self):
+        # Well past NOTIFY's 8000 bytes per card, and more once JSON-escaped.
+        await Occurrence.objects.abulk_create(
+            Occurrence(title=f"Carta {index}", summary="Ação é história. " * 600, year=1900 + index, language="pt-br")
+            for index in range(40)
+        )
+        await sync_to_async(catalog.clear)()
+        await sync_to_async(sampler.invalidate)()
+        match = await sync_to_async(new_match)(lang="pt-br", as_dict=False)
+        cards = (match.player_hand_ids + match.deck_ids)[:MAX_BATCH_PLAYS]
+        broker = get_event_broker()
+        try:
+            async with broker.subscribe(match.id) as queue:
+                result = await sync_to_async(submit_plays_on_match)(
+                    match.id, [{"occurrence_id": card, "position": 0} for card in cards],
+                )
+                events = []
+                while len(events) < len(result["events"]):
+                    events += await asyncio.wait_for(queue.get(), 5)
+        finally:
+            await broker.stop()
+
+        self.assertIsInstance(broker, PostgresBroker)
+        self.assertEqual(events, result["events"])
+        self.assertTrue(events[0]["drawn"]["summary"].startswith("Ação"))
@@ -0,0 +1,132 @@
+import tempfile
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from chronoguess.core.models import Match, Occurrence
+from chronoguess.core.repositories import get_match_repository
+from chronoguess.core.tests.base import PlayMixin, cached_store
+from chronoguess.core.usecases import new_match
+
+
+@cached_store(
+    MATCH_STORE_FLUSH_EVERY=3,
+    # Leaves the play log INSERT as the only query of a cached play.
+    MATCH_EVENT_BROKER="chronoguess.core.events.InProcessBroker",
+)
+class CacheMatchRepositoryTestCase(PlayMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches["match_store"].clear()
+
+    def test_plays_are_written_behind(self):
+        match = new_match(lang="en")
+
+        self.play(match["id"])
+        self.play(match["id"])
+
+        stored = self.client.get(f'/api/match/{match["id"]}/').json()
+        self.assertEqual(Match.objects.get(id=match["id"]).version, 1)
+        self.assertEqual(len(stored["timeline"]) + len(stored["mistakes"]), 3)
+
+        self.play(match["id"])
+
+        row = Match.objects.get(id=match["id"])
+        self.assertEqual(row.version, 4)
+        self.assertEqual(len(row.timeline_ids) + len(row.mistake_ids), 4)
+
+    def test_play_only_appends_to_log(self):
+        match = new_match(lang="en")
+        self.client.get(f'/api/match/{match["id"]}/')
+
+        with self.assertNumQueries(1):
+            response = self.client.post(f'/api/match/{match["id"]}/', content_type='application/json', data={
+                "occurrence_id": match["player_hand"][0]["id"],
+                "position": 0
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_lost_store_catches_up_from_log(self):
+        match = new_match(lang="en")
+        self.play(match["id"])
+        played = self.play(match["id"]).json()["match"]
+
+        caches["match_store"].clear()
+
+        self.assertEqual(Match.objects.get(id=match["id"]).version, 1)
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/').json(), played)
+        self.play(match["id"])
+        self.assertEqual(Match.objects.get(id=match["id"]).version, 4)
+
+    def test_finished_match_is_flushed(self):
+        match = new_match(lang="en")
+        self.make_first_slot_wrong(match["id"], remaining_life=1)
+        caches["match_store"].clear()
+
+        self.play(match["id"])
+
+        self.assertEqual(Match.objects.get(id=match["id"]).status, "lose")
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/').json()["status"], "lose")
+        self.assertIsNone(caches["match_store"].get(get_match_repository().key(match["id"])))
+
+    @override_settings(MATCH_STORE_TTL=0)
+    def test_expired_match_is_read_back(self):
+        match = new_match(lang="en")
+        self.play(match["id"])
+
+        self.assertIsNone(caches["match_store"].get(get_match_repository().key(match["id"])))
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/').headers["ETag"], f'"{match["id"]}-2"')
+
+    def test_occurrence_edit_resorts_cached_timeline(self):
+        match = new_match(lang="en")
+        occurrence = Occurrence.objects.get(id=match["player_hand"][0]["id"])
+        later = occurrence.year >= match["timeline"][0]["year"]
+        self.play(match["id"], 1 if later else 0)
+
+        occurrence.year = -100000 if later else 100000
+        occurrence.save()
+
+        row = Match.objects.get(id=match["id"])
+        self.assertEqual(row.version, 3)
+        self.assertEqual(row.timeline_ids[0 if later else 1], occurrence.id)
+        occurrence.save()
+        self.assertEqual(Match.objects.get(id=match["id"]).version, 3)
+        caches["match_store"].clear()
+        self.assertEqual(self.play(match["id"]).status_code, 200)
+
+    def test_not_modified(self):
+        match = new_match(lang="en")
+        etag = self.play(match["id"]).headers["ETag"]
+
+        response = self.client.get(f'/api/match/{match["id"]}/', headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_file_backed_store(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "catalog": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "match_store": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": directory},
+        }):
+            match = new_match(lang="en")
+            self.play(match["id"])
+
+            self.assertEqual(self.client.get(f'/api/match/{match["id"]}/').headers["ETag"], f'"{match["id"]}-2"')
+            self.assertEqual(Match.objects.get(id=match["id"]).version, 1)
+
+    @override_settings(MATCH_STORE_LOCK_WAIT=0.05)
+    def test_busy_match(self):
+        match = new_match(lang="en")
+        repository = get_match_repository()
+        caches["match_store"].add(repository.lock_key(match["id"]), "other play", 5)
+
+        response = self.play(match["id"])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(f'/api/match/{match["id"]}/').headers["ETag"], f'"{match["id"]}-1"')
+
+    @override_settings(GUNICORN_WORKERS=3)
+    def test_process_local_store_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_match_repository().get(1)
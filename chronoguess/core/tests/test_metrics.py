@@ -0,0 +1,39 @@
+from django.test import TestCase, Client, override_settings
+from chronoguess.core.catalog import catalog
+from chronoguess.core.usecases import new_match
+
+
+class MetricsTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_server_timing(self):
+        match = new_match(lang="en")
+        catalog.clear()
+
+        with self.assertLogs('chronoguess.requests', level='INFO') as logs:
+            response = Client().get(f'/api/match/{match["id"]}/')
+
+        self.assertRegex(response.headers["Server-Timing"], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries"$')
+        self.assertIn('"view": "match-detail"', logs.output[0])
+        self.assertIn('"queries": 2', logs.output[0])
+
+    @override_settings(REQUEST_METRICS_ENABLED=True, INTERNAL_ENDPOINTS_ENABLED=True)
+    def test_prometheus_endpoint(self):
+        client = Client()
+        client.get('/api/match/')
+
+        response = client.get('/api/_metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('chronoguess_request_duration_seconds_count{route="api/match/",method="GET"}', response.content.decode())
+        self.assertIn('chronoguess_catalog_cache_misses_total', response.content.decode())
+
+    def test_disabled(self):
+        response = Client().get('/api/match/')
+        self.assertNotIn("Server-Timing", response.headers)
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_prometheus_endpoint_is_internal(self):
+        self.assertEqual(Client().get('/api/_metrics').status_code, 404)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Match, Occurrence, OccurrenceStats, Play
+from chronoguess.core.stats import aggregate_batch
+from chronoguess.core.tests.base import PlayMixin
+from chronoguess.core.usecases import new_match
+
+
+class OccurrenceStatsTestCase(PlayMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def misplace(self, match_id):
+        row = Match.objects.get(id=match_id)
+        card = row.player_hand_ids[0]
+        late = catalog.get(card).year < row.timeline_years[0]
+        # The last slot is too late for cards before the timeline, the first too early otherwise.
+        self.play(match_id, len(row.timeline_years) if late else 0)
+        return card, late
+
+    def aggregate(self):
+        return aggregate_batch(settle=timedelta(0))
+
+    def test_incorrect_play_logs_direction(self):
+        match = new_match(lang="en")
+
+        card, late = self.misplace(match["id"])
+
+        play = Play.objects.get(match_id=match["id"], occurrence_id=card)
+        self.assertFalse(play.correct)
+        self.assertEqual(play.offset > 0, late)
+        self.assertNotEqual(play.offset, 0)
+
+    def test_aggregates_plays_incrementally(self):
+        match = new_match(lang="en")
+        card, late = self.misplace(match["id"])
+
+        self.assertEqual(self.aggregate(), 1)
+        self.assertEqual(self.aggregate(), 0)
+        stats = OccurrenceStats.objects.get(occurrence_id=card)
+        self.assertEqual((stats.played, stats.correct), (1, 0))
+        self.assertEqual((stats.placed_early, stats.placed_late), (0, 1) if late else (1, 0))
+        self.assertEqual(stats.language, "en")
+
+        self.misplace(match["id"])
+        self.misplace(match["id"])
+
+        self.assertEqual(self.aggregate(), 2)
+        self.assertEqual(sum(OccurrenceStats.objects.values_list("played", flat=True)), 3)
+
+    def test_recent_plays_wait_for_settle(self):
+        match = new_match(lang="en")
+        self.misplace(match["id"])
+
+        self.assertEqual(aggregate_batch(), 0)
+
+    def test_younger_lower_id_play_holds_the_checkpoint(self):
+        first, second = Occurrence.objects.filter(language="en")[:2]
+        now = timezone.now()
+        younger = Play.objects.create(
+            match_id=0, version=2, occurrence_id=first.id, year=first.year, position=0, correct=True,
+            played_at=now - timedelta(seconds=5),
+        )
+        Play.objects.create(
+            match_id=0, version=3, occurrence_id=second.id, year=second.year, position=0, correct=True,
+            played_at=now - timedelta(seconds=30),
+        )
+
+        self.assertEqual(aggregate_batch(settle=timedelta(seconds=10)), 0)
+        Play.objects.filter(id=younger.id).update(played_at=now - timedelta(seconds=20))
+        self.assertEqual(aggregate_batch(settle=timedelta(seconds=10)), 2)
+        self.assertEqual(OccurrenceStats.objects.filter(occurrence__in=[first, second]).count(), 2)
+
+    def test_endpoint_orders_by_misplacements(self):
+        occurrences = list(Occurrence.objects.filter(language="en")[:3])
+        for occurrence, (played, correct) in zip(occurrences, [(10, 9), (10, 2), (4, 0)]):
+            OccurrenceStats.objects.create(
+                occurrence=occurrence, language="en", played=played, correct=correct, placed_early=played - correct,
+            )
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/occurrences/stats/?limit=2')
+        with self.assertNumQueries(0):
+            self.client.get('/api/occurrences/stats/?limit=2')
+
+        data = response.json()["occurrences"]
+        self.assertEqual([row["id"] for row in data], [occurrences[1].id, occurrences[2].id])
+        self.assertEqual(data[0]["correct_ratio"], 0.2)
+        self.assertEqual(data[0]["title"], occurrences[1].title)
+
+    def test_endpoint_validates_params(self):
+        self.assertEqual(self.client.get('/api/occurrences/stats/?lang=xx').status_code, 400)
+        self.assertEqual(self.client.get('/api/occurrences/stats/?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/occurrences/stats/?limit=ten').status_code, 400)
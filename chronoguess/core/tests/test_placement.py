@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+from chronoguess.core.usecases import is_correct_placement, placement_offset
+
+
+class PlacementTestCase(SimpleTestCase):
+
+    def test_between_cards(self):
+        self.assertTrue(is_correct_placement([1900, 1950, 2000], 1960, 2))
+        self.assertFalse(is_correct_placement([1900, 1950, 2000], 1960, 1))
+        self.assertFalse(is_correct_placement([1900, 1950, 2000], 1960, 3))
+
+    def test_edges(self):
+        self.assertTrue(is_correct_placement([1900, 1950], 1800, 0))
+        self.assertTrue(is_correct_placement([1900, 1950], 2000, 2))
+        self.assertFalse(is_correct_placement([1900, 1950], 2000, 0))
+
+    def test_same_year_run(self):
+        years = [1800, 1900, 1900, 1900, 2000]
+        self.assertFalse(is_correct_placement(years, 1900, 0))
+        for position in range(1, 5):
+            self.assertTrue(is_correct_placement(years, 1900, position))
+        self.assertFalse(is_correct_placement(years, 1900, 5))
+
+    def test_invalid_position(self):
+        with self.assertRaises(ValueError):
+            is_correct_placement([1900], 1950, 2)
+        with self.assertRaises(ValueError):
+            is_correct_placement([1900], 1950, -1)
+
+    def test_offset(self):
+        years = [1800, 1900, 1900, 2000]
+        self.assertEqual(placement_offset(years, 1900, 2), 0)
+        self.assertEqual(placement_offset(years, 1900, 0), -1)
+        self.assertEqual(placement_offset(years, 1700, 3), 3)
+        self.assertEqual(placement_offset(years, 2100, 1), -3)
@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from chronoguess.core.catalog import catalog
+from chronoguess.core.history import apply_plays, dealt_match, rebuild_match
+from chronoguess.core.models import Match, Play
+from chronoguess.core.tests.base import PlayMixin
+from chronoguess.core.usecases import new_match
+
+STATE_FIELDS = ['timeline_ids', 'timeline_years', 'player_hand_ids', 'deck_ids', 'mistake_ids', 'remaining_life', 'status', 'version']
+
+
+class PlayLogTestCase(PlayMixin, TestCase):
+
+    def state(self, match):
+        return {field: getattr(match, field) for field in STATE_FIELDS}
+
+    def test_each_play_appends_one_row(self):
+        match = new_match(lang="en")
+        card = catalog.get(match["player_hand"][0]["id"])
+
+        status = self.play(match["id"]).json()["status"]
+
+        play = Play.objects.get(match_id=match["id"])
+        self.assertEqual(
+            (play.version, play.occurrence_id, play.year, play.position, play.correct),
+            (2, card.id, card.year, 0, status == "correct"),
+        )
+
+    def test_batch_appends_one_row_per_play(self):
+        match = new_match(lang="en")
+        row = Match.objects.get(id=match["id"])
+        cards = row.player_hand_ids + row.deck_ids[:2]
+
+        self.client.post(f'/api/match/{match["id"]}/plays/', content_type='application/json', data={
+            "plays": [{"occurrence_id": card, "position": 0} for card in cards],
+        })
+
+        plays = Play.objects.filter(match_id=match["id"]).order_by("version")
+        self.assertEqual([(play.version, play.occurrence_id) for play in plays], list(zip([2, 3, 4], cards)))
+
+    def test_rebuild_matches_snapshot(self):
+        match = new_match(lang="en")
+        for position in (0, 1, 0, 1, 2, 0, 1):
+            self.play(match["id"], position % 2)
+
+        stored = Match.objects.get(id=match["id"])
+        self.assertEqual(self.state(rebuild_match(match["id"])), self.state(stored))
+
+    def test_rebuild_lost_match(self):
+        match = new_match(lang="en")
+        while (row := Match.objects.get(id=match["id"])).status == "ongoing":
+            year = catalog.get(row.player_hand_ids[0]).year
+            # The first slot is wrong for cards after the timeline, the last one otherwise.
+            self.play(match["id"], 0 if year > row.timeline_years[0] else len(row.timeline_years))
+
+        self.assertEqual(row.status, "lose")
+        self.assertEqual(self.state(rebuild_match(match["id"])), self.state(row))
+
+    def test_tampered_snapshot_does_not_replay(self):
+        match = new_match(lang="en")
+        self.play(match["id"])
+        self.play(match["id"])
+        Match.objects.filter(id=match["id"]).update(dealt_deck_ids=[0, 0])
+
+        with self.assertRaises(ValueError):
+            rebuild_match(match["id"])
+
+    def test_projector_applies_only_new_plays(self):
+        match = new_match(lang="en")
+        for _ in range(4):
+            self.play(match["id"])
+        plays = list(Play.objects.filter(match_id=match["id"]).order_by("version"))
+
+        snapshot = apply_plays(dealt_match(Match.objects.get(id=match["id"])), plays[:2])
+        self.assertEqual(snapshot.version, 3)
+        apply_plays(snapshot, plays)
+
+        self.assertEqual(self.state(snapshot), self.state(Match.objects.get(id=match["id"])))
+
+    def test_rebuild_matches_command(self):
+        match = new_match(lang="en")
+        self.play(match["id"])
+        Match.objects.filter(id=match["id"]).update(remaining_life=1)
+        stdout = StringIO()
+
+        call_command("rebuild_matches", str(match["id"]), "--fix", stdout=stdout)
+
+        self.assertIn("1 differ", stdout.getvalue())
+        self.assertEqual(Match.objects.get(id=match["id"]).remaining_life, rebuild_match(match["id"]).remaining_life)
+        self.assertNotEqual(Match.objects.get(id=match["id"]).remaining_life, 1)
+
+    def test_match_dealt_before_the_log(self):
+        match = new_match(lang="en")
+        Match.objects.filter(id=match["id"]).update(dealt_deck_ids=[])
+
+        with self.assertRaises(ValueError):
+            rebuild_match(match["id"])
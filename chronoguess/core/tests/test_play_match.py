@@ -2,9 +2,13 @@ from django.test import TestCase, Client
 from unittest.mock import ANY
 from chronoguess.core.usecases import new_match
 from chronoguess.core.models import Occurrence, Match
+from chronoguess.core.catalog import catalog
 
 class PlayMatchTestCase(TestCase):
 
+    def setUp(self):
+        catalog.clear()
+
     def test_correct_play(self):
         start_match = new_match(lang="en")
         client = Client()
@@ -218,7 +222,7 @@ class PlayMatchTestCase(TestCase):
 
         for player_hand in range(0, 11):
             match = Match.objects.get(id=start_match["id"])
-            occurrence = match.player_hand.first()
+            occurrence = Occurrence.objects.get(id=match.player_hand_ids[0])
             occurrence.year = 9999
             occurrence.save()
             response = client.post(f'/api/match/{start_match["id"]}/', content_type='application/json', data={
@@ -262,3 +266,37 @@ class PlayMatchTestCase(TestCase):
         })
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json(), {"error": "Occurrence not in player's hand"})
+
+    def test_draw_follows_deck_order(self):
+        start_match = new_match(lang="en")
+        client = Client()
+        deck_ids = Match.objects.get(id=start_match["id"]).deck_ids
+
+        response = client.post(f'/api/match/{start_match["id"]}/', content_type='application/json', data={
+            "occurrence_id": start_match["player_hand"][0]["id"],
+            "position": 0
+        })
+
+        match = Match.objects.get(id=start_match["id"])
+        self.assertEqual(response.json()["match"]["player_hand"][0]["id"], deck_ids[0])
+        self.assertEqual(match.player_hand_ids, deck_ids[:1])
+        self.assertEqual(match.deck_ids, deck_ids[1:])
+
+    def test_invalid_position(self):
+        start_match = new_match(lang="en")
+        client = Client()
+
+        response = client.post(f'/api/match/{start_match["id"]}/', content_type='application/json', data={
+            "occurrence_id": start_match["player_hand"][0]["id"],
+            "position": 5
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Invalid position"})
+
+    def test_not_found(self):
+        client = Client()
+        response = client.post('/api/match/1/', content_type='application/json', data={
+            "occurrence_id": 1,
+            "position": 0
+        })
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,91 @@
+from django.test import TestCase, Client
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Match, Occurrence
+from chronoguess.core.sampler import sampler
+from chronoguess.core.usecases import new_match
+
+
+class QueryBudgetTestCase(TestCase):
+    # Plays run in a transaction, which TestCase turns into a SAVEPOINT and
+    # RELEASE pair; both count as queries here.
+
+    def setUp(self):
+        catalog.clear()
+        sampler.invalidate()
+        catalog.get_many(sampler.ids("en"))
+
+    def test_create_match(self):
+        client = Client()
+        with self.assertNumQueries(3):
+            response = client.get('/api/match/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_match(self):
+        match = new_match(lang="en")
+        client = Client()
+        with self.assertNumQueries(1):
+            response = client.get(f'/api/match/{match["id"]}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_match_cold_catalog(self):
+        match = new_match(lang="en")
+        catalog.clear()
+        client = Client()
+        with self.assertNumQueries(2):
+            response = client.get(f'/api/match/{match["id"]}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_play_match(self):
+        match = new_match(lang="en")
+        client = Client()
+        # SAVEPOINT, locked SELECT, UPDATE, play log INSERT, NOTIFY, RELEASE.
+        with self.assertNumQueries(6):
+            response = client.post(f'/api/match/{match["id"]}/', content_type='application/json', data={
+                "occurrence_id": match["player_hand"][0]["id"],
+                "position": 0
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_play_match_cold_catalog(self):
+        match = new_match(lang="en")
+        catalog.clear()
+        client = Client()
+        # The play event loads the drawn card alone, so delta responses never
+        # read the rest of the match's cards.
+        with self.assertNumQueries(9):
+            response = client.post(f'/api/match/{match["id"]}/', content_type='application/json', data={
+                "occurrence_id": match["player_hand"][0]["id"],
+                "position": 0
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_serialization_does_not_depend_on_timeline_size(self):
+        match = new_match(lang="en")
+        client = Client()
+        for _ in range(3):
+            occurrence = Occurrence.objects.get(id=client.get(f'/api/match/{match["id"]}/').json()["player_hand"][0]["id"])
+            occurrence.year = 9999
+            occurrence.save()
+            client.post(f'/api/match/{match["id"]}/', content_type='application/json', data={
+                "occurrence_id": occurrence.id,
+                "position": len(client.get(f'/api/match/{match["id"]}/').json()["timeline"])
+            })
+
+        with self.assertNumQueries(1):
+            client.get(f'/api/match/{match["id"]}/')
+
+    def test_play_does_not_depend_on_timeline_size(self):
+        start_match = new_match(lang="en")
+        match = Match.objects.get(id=start_match["id"])
+        timeline = Occurrence.objects.filter(language="en").exclude(id__in=match.player_hand_ids).order_by('year')[:30]
+        match.timeline_ids = [occurrence.id for occurrence in timeline]
+        match.timeline_years = [occurrence.year for occurrence in timeline]
+        match.save()
+        client = Client()
+
+        with self.assertNumQueries(6):
+            response = client.post(f'/api/match/{match.id}/', content_type='application/json', data={
+                "occurrence_id": match.player_hand_ids[0],
+                "position": 15
+            })
+        self.assertEqual(response.status_code, 200)
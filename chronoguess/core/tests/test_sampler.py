@@ -0,0 +1,43 @@
+from django.test import TestCase
+from chronoguess.core.models import Occurrence
+from chronoguess.core.sampler import OccurrenceSampler
+from chronoguess.core.catalog import catalog
+
+
+class SamplerTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+
+    def test_deal_distinct_cards_of_language(self):
+        sampler = OccurrenceSampler()
+
+        cards = sampler.deal("en", 16)
+
+        self.assertEqual(len(cards), 16)
+        self.assertEqual(len({card.id for card in cards}), 16)
+        self.assertTrue(all(card.language == "en" for card in cards))
+
+    def test_deal_fetches_only_sampled_rows(self):
+        sampler = OccurrenceSampler()
+        sampler.ids("en")
+
+        with self.assertNumQueries(1):
+            sampler.deal("en", 16)
+
+    def test_deleted_occurrence_is_not_dealt(self):
+        sampler = OccurrenceSampler()
+        ids = list(sampler.ids("pt-br"))
+        Occurrence.objects.filter(id__in=ids[1:]).delete()
+
+        cards = sampler.deal("pt-br", 16)
+
+        self.assertEqual([card.id for card in cards], ids[:1])
+
+    def test_invalidate(self):
+        sampler = OccurrenceSampler()
+        before = len(sampler.ids("en"))
+        Occurrence.objects.create(title="New card", summary="New card", year=2000, language="en")
+        sampler.invalidate("en")
+
+        self.assertEqual(len(sampler.ids("en")), before + 1)
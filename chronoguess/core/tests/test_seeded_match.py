@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.utils import timezone
+from chronoguess.core.catalog import catalog
+from chronoguess.core.models import Game, Match
+from chronoguess.core.usecases import daily_seed, new_match, seeded_game_key
+
+
+class SeededMatchTestCase(TestCase):
+
+    def setUp(self):
+        catalog.clear()
+        cache.clear()
+        self.client = Client()
+
+    def test_same_seed_shares_game(self):
+        first = Match.objects.get(id=self.client.get('/api/match/?seed=abc').json()["id"])
+        second = Match.objects.get(id=self.client.get('/api/match/?seed=abc').json()["id"])
+
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(first.game_id, second.game_id)
+        self.assertEqual(first.player_hand_ids, second.player_hand_ids)
+        self.assertEqual(first.timeline_ids, second.timeline_ids)
+        self.assertEqual(first.deck_ids, second.deck_ids)
+        self.assertEqual(Game.objects.filter(seed="abc").count(), 1)
+
+    def test_other_seed_or_language(self):
+        games = {
+            Match.objects.get(id=self.client.get(f'/api/match/?{query}').json()["id"]).game_id
+            for query in ("seed=abc", "seed=xyz", "seed=abc&lang=pt-br")
+        }
+        self.assertEqual(len(games), 3)
+
+    def test_deal_is_deterministic(self):
+        first = Match.objects.get(id=new_match(lang="en", seed="abc")["id"])
+        Game.objects.filter(seed="abc").delete()
+        cache.clear()
+
+        second = Match.objects.get(id=new_match(lang="en", seed="abc")["id"])
+
+        self.assertNotEqual(first.game_id, second.game_id)
+        self.assertEqual(first.player_hand_ids + first.timeline_ids, second.player_hand_ids + second.timeline_ids)
+        self.assertEqual(first.deck_ids, second.deck_ids)
+
+    def test_shared_game_creates_one_row(self):
+        self.client.get('/api/match/?seed=abc')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/match/?seed=abc')
+        self.assertEqual(response.status_code, 200)
+
+    def test_daily(self):
+        match = self.client.get('/api/match/?daily=true').json()
+
+        self.assertEqual(Match.objects.get(id=match["id"]).game.seed, daily_seed())
+
+    def test_invalid_seed(self):
+        response = self.client.get(f'/api/match/?seed={"x" * 101}')
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(response.json(), {"error": "Invalid seed"})
+
+    def test_compaction_keeps_seeded_game_in_use(self):
+        match = Match.objects.get(id=new_match(lang="en", seed="abc")["id"])
+        other = Match.objects.get(id=new_match(lang="en", seed="abc")["id"])
+        Match.objects.filter(id=match.id).update(status="win", updated_at=timezone.now() - timedelta(days=2))
+
+        call_command("compact_matches", "--pause", "0", stdout=StringIO())
+
+        self.assertFalse(Match.objects.filter(id=match.id).exists())
+        self.assertTrue(Game.objects.filter(id=other.game_id).exists())
+
+    def test_compaction_deletes_unused_seeded_game(self):
+        match = Match.objects.get(id=new_match(lang="en", seed="abc")["id"])
+        Match.objects.filter(id=match.id).update(status="win", updated_at=timezone.now() - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("compact_matches", "--pause", "0", stdout=StringIO())
+
+        self.assertFalse(Game.objects.filter(id=match.game_id).exists())
+        self.assertIsNone(cache.get(seeded_game_key("en", "abc")))
+        again = Match.objects.get(id=new_match(lang="en", seed="abc")["id"])
+        self.assertEqual(again.player_hand_ids + again.timeline_ids, match.player_hand_ids + match.timeline_ids)
@@ -4,4 +4,10 @@ from . import views
 urlpatterns = [
     path('match/', views.MatchListView.as_view(), name='match-list'),
     path('match/<int:match_id>/', views.MatchDetailView.as_view(), name='match-detail'),
+    path('match/<int:match_id>/plays/', views.MatchPlaysView.as_view(), name='match-plays'),
+    path('match/<int:match_id>/events/', views.MatchEventsView.as_view(), name='match-events'),
+    path('occurrences/stats/', views.OccurrenceStatsView.as_view(), name='occurrence-stats'),
+    path('catalog/<str:lang>/<str:version>.json', views.CatalogBundleView.as_view(), name='catalog-bundle'),
+    path('_catalog/', views.CatalogStatsView.as_view(), name='catalog-stats'),
+    path('_metrics', views.MetricsView.as_view(), name='metrics'),
 ]
@@ -1,67 +1,297 @@
-from .models import Match, Game, Occurrence
+import random
+from bisect import bisect_left, bisect_right
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import pool
+from .catalog import catalog
+from .events import get_event_broker, play_event
+from .models import Match, Game, Play
+from .repositories import get_match_repository
+from .sampler import sampler
 from django.core.exceptions import ObjectDoesNotExist
 
+DEAL_SIZE = 16
+# Every card but the starting timeline one can be played at most once.
+MAX_BATCH_PLAYS = DEAL_SIZE - 1
 
-def new_match(lang: str):
-    selected_occurrences = list(Occurrence.objects.filter(language=lang).order_by('?')[:16])
-    starting_hand = selected_occurrences[0]
-    starting_timeline = selected_occurrences[1]
-    game = Game.objects.create(
-        starting_hand=starting_hand,
-        starting_timeline=starting_timeline,
+
+def _new_game(lang, selected_occurrences, seed=None):
+    return Game(
+        language=lang,
+        seed=seed,
+        starting_hand=selected_occurrences[0],
+        starting_timeline=selected_occurrences[1],
     )
-    deck = selected_occurrences[2:]
-    game.deck.set(deck)
-    match = Match.objects.create(game=game)
-    match.player_hand.set([starting_hand])
-    match.timeline.set([starting_timeline])
-    match.deck.set(deck)
 
-    return match.as_dict()
+
+def _new_match(game_id, starting_hand, starting_timeline, deck_ids):
+    match = Match(
+        game_id=game_id,
+        player_hand_ids=[starting_hand.id],
+        timeline_ids=[starting_timeline.id],
+        timeline_years=[starting_timeline.year],
+        deck_ids=deck_ids,
+        dealt_deck_ids=list(deck_ids),
+    )
+    match.reset_cards(player_hand=[starting_hand], timeline=[starting_timeline], mistakes=[])
+    return match
+
+
+def _dealt_match(game, selected_occurrences):
+    starting_hand, starting_timeline, *deck = selected_occurrences
+    return _new_match(game.id, starting_hand, starting_timeline, [occurrence.id for occurrence in deck])
+
+
+def _pooled_match(lang):
+    with transaction.atomic():
+        claimed = pool.claim(lang)
+        if claimed is None:
+            return None
+        game, deck_ids = claimed
+        starting_cards = catalog.get_many([game.starting_hand_id, game.starting_timeline_id])
+        match = _new_match(
+            game.id, starting_cards[game.starting_hand_id], starting_cards[game.starting_timeline_id], deck_ids,
+        )
+        match.save()
+    get_match_repository().created(match)
+    return match
+
+
+def daily_seed():
+    return f"daily-{timezone.now().date().isoformat()}"
+
+
+def seeded_game_key(lang, seed):
+    return f"seeded-game:{lang}:{seed}"
+
+
+def _seeded_game(lang, seed):
+    # Shared by every player of the seed: the game id, starting cards and
+    # the deck in a draw order fixed by the seed. compact_matches deletes the
+    # entry with the game once no match is left on it.
+    key = seeded_game_key(lang, seed)
+    entry = cache.get(key)
+    if entry is None:
+        game = Game.objects.filter(language=lang, seed=seed).first()
+        if game is None:
+            selected_occurrences = sampler.deal(lang, DEAL_SIZE, rng=random.Random(f"{lang}:{seed}"))
+            try:
+                with transaction.atomic():
+                    game = _new_game(lang, selected_occurrences, seed=seed)
+                    game.save()
+                    game.deck.add(*selected_occurrences[2:])
+            except IntegrityError:
+                # Another worker dealt this seed first.
+                game = Game.objects.get(language=lang, seed=seed)
+        deck_ids = sorted(game.deck.through.objects.filter(game_id=game.id).values_list('occurrence_id', flat=True))
+        random.Random(f"{lang}:{seed}").shuffle(deck_ids)
+        entry = (game.id, game.starting_hand_id, game.starting_timeline_id, deck_ids)
+        cache.set(key, entry, None)
+    return entry
+
+
+def _seeded_match(lang, seed):
+    game_id, starting_hand_id, starting_timeline_id, deck_ids = _seeded_game(lang, seed)
+    starting_cards = catalog.get_many([starting_hand_id, starting_timeline_id])
+    if len(starting_cards) < 2:
+        # Deleting a starting card cascaded to the game; deal the seed again.
+        cache.delete(seeded_game_key(lang, seed))
+        game_id, starting_hand_id, starting_timeline_id, deck_ids = _seeded_game(lang, seed)
+        starting_cards = catalog.get_many([starting_hand_id, starting_timeline_id])
+    match = _new_match(game_id, starting_cards[starting_hand_id], starting_cards[starting_timeline_id], list(deck_ids))
+    try:
+        match.save()
+    except IntegrityError:
+        # compact_matches deleted the game after it was read from the cache.
+        cache.delete(seeded_game_key(lang, seed))
+        return _seeded_match(lang, seed)
+    get_match_repository().created(match)
+    return match
+
+
+def new_match(lang: str, as_dict=True, seed=None):
+    if seed is not None:
+        match = _seeded_match(lang, seed)
+    else:
+        match = _pooled_match(lang) if settings.GAME_POOL_SIZE else None
+    if match is None:
+        selected_occurrences = sampler.deal(lang, DEAL_SIZE)
+        game = _new_game(lang, selected_occurrences)
+        game.save()
+        game.deck.add(*selected_occurrences[2:])
+        match = _dealt_match(game, selected_occurrences)
+        match.save()
+        get_match_repository().created(match)
+
+    return match.as_dict() if as_dict else match
+
+
+async def anew_match(lang: str, as_dict=True, seed=None):
+    # Seeded deals and select_for_update need a transaction, which the
+    # async ORM can't open.
+    if seed is not None:
+        match = await sync_to_async(_seeded_match)(lang, seed)
+    else:
+        match = await sync_to_async(_pooled_match)(lang) if settings.GAME_POOL_SIZE else None
+    if match is None:
+        selected_occurrences = await sampler.adeal(lang, DEAL_SIZE)
+        game = _new_game(lang, selected_occurrences)
+        await game.asave()
+        await game.deck.aadd(*selected_occurrences[2:])
+        match = _dealt_match(game, selected_occurrences)
+        await match.asave()
+        await get_match_repository().acreated(match)
+
+    return match.as_dict() if as_dict else match
 
 
 def get_match_by_id(match_id, as_dict=True):
-    match = Match.objects.filter(id=match_id).first()
+    match = get_match_repository().get(match_id)
     if not match:
         return None
     return match.as_dict() if as_dict else match
 
-def submit_occurence_on_match(match, played_occurence, position: int):
 
-    timeline = match.timeline.order_by('year')
-    
-    correct_submition = False
-    if position == 0:
-        correct_submition = timeline[0].year >= played_occurence.year
-    elif position < len(timeline):
-        correct_submition = timeline[position - 1].year <= played_occurence.year <= timeline[position].year
-    elif position == len(timeline):
-        correct_submition = timeline.last().year <= played_occurence.year
-    else:
+async def aget_match_by_id(match_id, as_dict=True):
+    match = await get_match_repository().aget(match_id)
+    if not match or not as_dict:
+        return match
+    await match.acards()
+    return match.as_dict()
+
+def is_correct_placement(timeline_years, year: int, position: int):
+    if not 0 <= position <= len(timeline_years):
         raise ValueError("Invalid position")
+    # Any slot between the first and last card sharing this year is correct.
+    return bisect_left(timeline_years, year) <= position <= bisect_right(timeline_years, year)
+
+
+def placement_offset(timeline_years, year: int, position: int):
+    first, last = bisect_left(timeline_years, year), bisect_right(timeline_years, year)
+    if position < first:
+        return position - first
+    return max(0, position - last)
+
+
+def play_occurrence(match, played_occurence, position: int):
+
+    correct_submition = is_correct_placement(match.timeline_years, played_occurence.year, position)
     
     if correct_submition:
-        match.timeline.add(played_occurence)
+        match.timeline_ids.insert(position, played_occurence.id)
+        match.timeline_years.insert(position, played_occurence.year)
     else:
         match.remaining_life -= 1
-        match.mistakes.add(played_occurence)
+        match.mistake_ids.append(played_occurence.id)
         if match.remaining_life <= 0:
             match.status = Match.StatusChoices.LOSE
         
     
-    match.player_hand.remove(played_occurence)
-    drawed_card = match.deck.first()
-    if drawed_card:
-        match.player_hand.add(drawed_card)
-        match.deck.remove(drawed_card)
-    match.save()
-
-    if match.timeline.count() == 12:
-        match.player_hand.clear()
+    match.player_hand_ids.remove(played_occurence.id)
+    if match.deck_ids:
+        match.player_hand_ids.append(match.deck_ids.pop(0))
+
+    if len(match.timeline_ids) == Match.TIMELINE_SIZE_GOAL:
+        match.player_hand_ids = []
         match.status = Match.StatusChoices.WIN
-        match.save()
+    match.version += 1
+    match.reset_cards()
+
+    return correct_submition
+
+
+def play_record(match, played_occurence, position, correct):
+    """Play log row of a move ``match`` just applied; an incorrect move
+    left the timeline as it was, so its offset is measured against it."""
+    return Play(
+        match_id=match.id,
+        version=match.version,
+        occurrence_id=played_occurence.id,
+        year=played_occurence.year,
+        position=position,
+        correct=correct,
+        offset=0 if correct else placement_offset(match.timeline_years, played_occurence.year, position),
+    )
+
+
+def _drawn_id(match, hand_ids):
+    return next((id for id in match.player_hand_ids if id not in hand_ids), None)
+
+
+def submit_occurence_on_match(match_id, occurrence_id, position: int, as_dict=True):
+    # The match lock serializes concurrent plays on one match, so a card is
+    # never drawn twice nor a life lost twice.
+    repository = get_match_repository()
+    with repository.locked(match_id) as match:
+        if not match:
+            return None
+        if match.status != Match.StatusChoices.ONGOING:
+            raise ValueError("Match is over")
+        if occurrence_id not in match.player_hand_ids:
+            raise ValueError("Occurrence not in player's hand")
+        played_occurence = catalog.get(occurrence_id)
+        hand_ids = list(match.player_hand_ids)
+        correct_submition = play_occurrence(match, played_occurence, position)
+        repository.save(match, [play_record(match, played_occurence, position, correct_submition)])
+        drawn_id = _drawn_id(match, hand_ids)
+        event = play_event(
+            match, played_occurence, position, correct_submition, catalog.get(drawn_id) if drawn_id else None,
+        )
+        get_event_broker().publish(match.id, [event])
 
     return {
         "status": "correct" if correct_submition else "incorrect",
-        "match": match.as_dict()
+        "match": match.as_dict() if as_dict else match,
+        "event": event,
+    }
+
+
+def submit_plays_on_match(match_id, plays, as_dict=True):
+    """Applies ``plays`` (``occurrence_id``/``position`` dicts) in order under
+    one match lock and saves once. Stops early when the match is won or lost;
+    an invalid play rolls the whole batch back."""
+    if len(plays) > MAX_BATCH_PLAYS:
+        raise ValueError(f"At most {MAX_BATCH_PLAYS} plays per request")
+    played_occurences = catalog.get_many({play["occurrence_id"] for play in plays})
+    results = []
+    events = []
+    records = []
+    repository = get_match_repository()
+    with repository.locked(match_id) as match:
+        if not match:
+            return None
+        for index, play in enumerate(plays):
+            if match.status != Match.StatusChoices.ONGOING:
+                break
+            hand_ids = list(match.player_hand_ids)
+            try:
+                if play["occurrence_id"] not in match.player_hand_ids:
+                    raise ValueError("Occurrence not in player's hand")
+                played_occurence = played_occurences[play["occurrence_id"]]
+                correct_submition = play_occurrence(match, played_occurence, play["position"])
+            except ValueError as error:
+                raise ValueError(f"Play {index}: {error}")
+            results.append("correct" if correct_submition else "incorrect")
+            records.append(play_record(match, played_occurence, play["position"], correct_submition))
+            events.append((
+                play_event(match, played_occurence, play["position"], correct_submition, None),
+                _drawn_id(match, hand_ids),
+            ))
+        if results:
+            repository.save(match, records)
+            drawn = catalog.get_many([drawn_id for _, drawn_id in events if drawn_id])
+            for event, drawn_id in events:
+                if drawn_id:
+                    event["drawn"] = drawn[drawn_id].as_dict(hide_year=True)
+            get_event_broker().publish(match.id, [event for event, _ in events])
+
+    return {
+        "results": results,
+        "match": match.as_dict() if as_dict else match,
+        "events": [event for event, _ in events],
     }
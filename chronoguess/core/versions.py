@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Match
+
+
+class MatchVersions:
+    """Current ``Match.version`` by match id for conditional GETs, read from
+    the ``MATCH_VERSION_CACHE_ALIAS`` cache when one is configured and from
+    the primary key index otherwise.
+
+    Writers ``set`` the version once their transaction commits and readers
+    only ``add``, so a reader racing a play can't put an older version back.
+    """
+
+    @property
+    def cache(self):
+        alias = settings.MATCH_VERSION_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def key(self, match_id):
+        return f'match-version:{match_id}'
+
+    def _queryset(self, match_id):
+        return Match.objects.filter(id=match_id).values_list('version', flat=True)
+
+    async def aget(self, match_id):
+        cache = self.cache
+        version = await cache.aget(self.key(match_id)) if cache else None
+        if version is None:
+            version = await self._queryset(match_id).afirst()
+            if cache and version is not None:
+                await cache.aadd(self.key(match_id), version)
+        return version
+
+    async def aremember(self, match):
+        if self.cache:
+            await self.cache.aadd(self.key(match.id), match.version)
+
+    def changed(self, match):
+        if self.cache:
+            self.cache.set(self.key(match.id), match.version)
+
+    def forget(self, match_ids):
+        if self.cache:
+            self.cache.delete_many([self.key(match_id) for match_id in match_ids])
+
+
+versions = MatchVersions()
@@ -1,43 +1,267 @@
+import asyncio
+import gzip
 import json
-from django.http import JsonResponse, HttpResponseNotAllowed
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import (
+    HttpResponse, JsonResponse, HttpResponseNotAllowed, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils.http import parse_etags
 from django.views import View
 from django.forms.models import model_to_dict
 
-from chronoguess.core.models import Occurrence
+from chronoguess.core.bundles import acompact_cards, bundle_contents, bundle_exists, partial_bundle
+from chronoguess.core.catalog import catalog
+from chronoguess.core.events import get_event_broker, sse_message
+from chronoguess.core.encoding import (
+    EncodedJsonResponse, compact_match_json, dumps, match_json, play_json, plays_json,
+)
+from chronoguess.core.metrics import registry
+from chronoguess.core.models import Game, Match, Occurrence, match_etag
+from chronoguess.core.repositories import MatchBusy, get_match_repository
+from chronoguess.core.stats import occurrence_stats
+from chronoguess.core.versions import versions
 
-from .usecases import new_match, get_match_by_id, submit_occurence_on_match
+from .usecases import anew_match, daily_seed, aget_match_by_id, submit_occurence_on_match, submit_plays_on_match
+
+
+DELTA_MEDIA_TYPE = "application/vnd.chronoguess.delta+json"
+COMPACT_MEDIA_TYPE = "application/vnd.chronoguess.compact+json"
+
+
+def wants_delta(request):
+    # Opt-in: plays answer with just what changed instead of the whole match.
+    return request.GET.get("format") == "delta" or DELTA_MEDIA_TYPE in request.headers.get("Accept", "")
+
+
+def wants_compact(request):
+    # Opt-in: cards by id, for clients holding the catalog bundle.
+    return request.GET.get("format") == "compact" or COMPACT_MEDIA_TYPE in request.headers.get("Accept", "")
+
+
+async def encoded_match(request, match):
+    if wants_compact(request):
+        return compact_match_json(match, *await acompact_cards(match))
+    await match.acards()
+    return match_json(match)
+
+
+def match_headers(request, match_id, version):
+    return {"ETag": match_etag(match_id, version, compact=wants_compact(request)), "Vary": "Accept"}
 
 
 class MatchListView(View):
-    def get(self, request):
+    async def get(self, request):
         lang = request.GET.get("lang", "en")
         if lang not in Occurrence.LanguageChoices:
             return JsonResponse({"error": "Invalid language"}, status=400)
-        return JsonResponse(new_match(lang), safe=False)
+        seed = daily_seed() if request.GET.get("daily") == "true" else request.GET.get("seed")
+        if seed is not None and not 0 < len(seed) <= Game._meta.get_field("seed").max_length:
+            return JsonResponse({"error": "Invalid seed"}, status=400)
+        match = await anew_match(lang, as_dict=False, seed=seed)
+        return EncodedJsonResponse(await encoded_match(request, match), headers={"Vary": "Accept"})
 
 
 class MatchDetailView(View):
-    def get(self, request, match_id):
-        match = get_match_by_id(match_id)
+    async def get(self, request, match_id):
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if etags:
+            version = await get_match_repository().aversion(match_id)
+            if version is None:
+                return JsonResponse({"error": "Not found"}, status=404)
+            headers = match_headers(request, match_id, version)
+            if headers["ETag"] in etags or "*" in etags:
+                return HttpResponseNotModified(headers=headers)
+
+        match = await aget_match_by_id(match_id, as_dict=False)
         if not match:
             return JsonResponse({"error": "Not found"}, status=404)
-        return JsonResponse(match)
+        await versions.aremember(match)
+        return EncodedJsonResponse(
+            await encoded_match(request, match), headers=match_headers(request, match.id, match.version),
+        )
 
-    def post(self, request, match_id):
+    async def post(self, request, match_id):
         try:
             payload = json.loads(request.body)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON"}, status=400)
+        if not (
+            isinstance(payload, dict)
+            and isinstance(payload.get("occurrence_id"), int)
+            and isinstance(payload.get("position"), int)
+        ):
+            return JsonResponse({"error": "Invalid play"}, status=400)
+
+        try:
+            # Runs in a thread: the async ORM can't hold a transaction.
+            match_result = await sync_to_async(submit_occurence_on_match)(
+                match_id, payload["occurrence_id"], position=payload["position"], as_dict=False,
+            )
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        except MatchBusy as error:
+            return JsonResponse({"error": str(error)}, status=409)
+        if not match_result:
+            return JsonResponse({"error": "Not found"}, status=404)
 
-        match = get_match_by_id(match_id, as_dict=False)
-        played_occurence = Occurrence.objects.get(id=payload["occurrence_id"])
+        match = match_result["match"]
+        if wants_delta(request):
+            return EncodedJsonResponse(dumps(match_result["event"]), headers={"ETag": match.etag})
+        content = play_json(match_result["status"], match, await encoded_match(request, match))
+        return EncodedJsonResponse(content, headers=match_headers(request, match.id, match.version))
 
-        if played_occurence not in match.player_hand.all():
-            return JsonResponse({"error": "Occurrence not in player's hand"}, status=400)
 
-        match_result = submit_occurence_on_match(match, played_occurence, position=payload["position"])
+class MatchPlaysView(View):
+    async def post(self, request, match_id):
+        try:
+            payload = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+        plays = payload.get("plays") if isinstance(payload, dict) else None
+        if not isinstance(plays, list) or not all(
+            isinstance(play, dict) and isinstance(play.get("occurrence_id"), int) and isinstance(play.get("position"), int)
+            for play in plays
+        ):
+            return JsonResponse({"error": "Invalid plays"}, status=400)
+
+        try:
+            match_result = await sync_to_async(submit_plays_on_match)(match_id, plays, as_dict=False)
+        except ValueError as error:
+            return JsonResponse({"error": str(error)}, status=400)
+        except MatchBusy as error:
+            return JsonResponse({"error": str(error)}, status=409)
         if not match_result:
             return JsonResponse({"error": "Not found"}, status=404)
 
-        return JsonResponse(match_result)
+        match = match_result["match"]
+        if wants_delta(request):
+            content = dumps({"version": match.version, "events": match_result["events"]})
+            return EncodedJsonResponse(content, headers={"ETag": match.etag})
+        content = plays_json(match_result["results"], match, await encoded_match(request, match))
+        return EncodedJsonResponse(content, headers=match_headers(request, match.id, match.version))
+
+
+def release_connection():
+    # Hand the request's connection back to the pool instead of holding it
+    # until the stream ends; TestCase's transaction must stay open.
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+class MatchEventsView(View):
+    """Server-Sent Events stream of a match: a ``ready`` event with the
+    current version once subscribed, then a ``play`` event (with the version
+    as its id) for each play, until the match ends."""
+
+    async def get(self, request, match_id):
+        if await get_match_repository().aversion(match_id) is None:
+            return JsonResponse({"error": "Not found"}, status=404)
+        return StreamingHttpResponse(
+            self.stream(match_id),
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def stream(self, match_id):
+        async with get_event_broker().subscribe(match_id) as queue:
+            # Read after subscribing: a client whose copy is older than this
+            # version refetches the match, and later plays arrive as events.
+            match = await get_match_repository().aget(match_id)
+            await sync_to_async(release_connection)()
+            if not match:
+                return
+            version, status = match.version, match.status
+            yield sse_message("ready", {"version": version, "status": status}, id=version)
+            while status == Match.StatusChoices.ONGOING:
+                try:
+                    events = await asyncio.wait_for(queue.get(), settings.MATCH_EVENTS_KEEPALIVE)
+                except TimeoutError:
+                    events = None
+                if events is None:
+                    yield b": keep-alive\n\n"
+                    continue
+                for event in events:
+                    if event["version"] <= version:
+                        continue
+                    yield sse_message("play", event, id=event["version"])
+                    status = event["status"]
+
+
+class OccurrenceStatsView(View):
+    MAX_LIMIT = 500
+
+    def get(self, request):
+        lang = request.GET.get("lang", "en")
+        if lang not in Occurrence.LanguageChoices:
+            return JsonResponse({"error": "Invalid language"}, status=400)
+        try:
+            limit = int(request.GET.get("limit", "50"))
+            min_played = int(request.GET.get("min_played", "1"))
+        except ValueError:
+            return JsonResponse({"error": "Invalid limit"}, status=400)
+        if not 0 < limit <= self.MAX_LIMIT or min_played < 1:
+            return JsonResponse({"error": "Invalid limit"}, status=400)
+        return JsonResponse({"occurrences": occurrence_stats(lang, limit, min_played)})
+
+
+class CatalogBundleView(View):
+    """The whole catalog of a language at ``version``, gzipped once when it
+    was built and cacheable forever. ``?ids=1,2`` answers just those cards
+    from the live catalog, for cards dealt after the client's bundle."""
+
+    MAX_IDS = 500
+    IMMUTABLE = "public, max-age=31536000, immutable"
+    PARTIAL_MAX_AGE = 300
+
+    def get(self, request, lang, version):
+        if lang not in Occurrence.LanguageChoices:
+            return JsonResponse({"error": "Not found"}, status=404)
+        if "ids" in request.GET:
+            return self.partial(request, lang, version)
+
+        etag = f'"{version}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return HttpResponseNotModified(headers={"ETag": etag, "Cache-Control": self.IMMUTABLE})
+        content = bundle_contents.get(lang, version)
+        if content is None:
+            return JsonResponse({"error": "Not found"}, status=404)
+        headers = {"ETag": etag, "Cache-Control": self.IMMUTABLE, "Vary": "Accept-Encoding"}
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+        else:
+            content = gzip.decompress(content)
+        return EncodedJsonResponse(content, headers=headers)
+
+    def partial(self, request, lang, version):
+        try:
+            ids = [int(id) for id in request.GET["ids"].split(",")]
+        except ValueError:
+            return JsonResponse({"error": "Invalid ids"}, status=400)
+        if not 0 < len(ids) <= self.MAX_IDS:
+            return JsonResponse({"error": "Invalid ids"}, status=400)
+        if not bundle_exists(lang, version):
+            return JsonResponse({"error": "Not found"}, status=404)
+        return EncodedJsonResponse(
+            partial_bundle(lang, ids), headers={"Cache-Control": f"public, max-age={self.PARTIAL_MAX_AGE}"},
+        )
+
 
+class InternalView(View):
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.INTERNAL_ENDPOINTS_ENABLED or not (
+            request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS or request.user.is_staff
+        ):
+            return JsonResponse({"error": "Not found"}, status=404)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class CatalogStatsView(InternalView):
+    def get(self, request):
+        return JsonResponse(catalog.stats())
+
+
+class MetricsView(InternalView):
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'chronoguess.core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -55,6 +57,8 @@ CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
 ]
 CORS_ORIGIN_ALLOW_ALL = True
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ["ETag"]
 
 ROOT_URLCONF = 'chronoguess.urls'
 
@@ -86,13 +90,124 @@ DATABASES = {
         "USER": os.getenv("POSTGRES_USER", "django"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "django"),
         "HOST": os.getenv("POSTGRES_HOST", "db"),
-        "PORT": "5432",
+        "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        # Ping reused connections first so a restarted server doesn't hand
+        # requests dead ones; with the pool, psycopg checks on checkout.
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
     }
 }
 
+# Worker processes serving the app; gunicorn.conf.py reads the same variable.
+GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", "3"))
+
+# Each gunicorn worker keeps its own psycopg pool, so the default max size
+# splits the server's connections (less some headroom for management
+# commands and psql) between the workers.
+DB_POOL = os.getenv("DB_POOL", "True").upper() == "TRUE"
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", max(
+            2, (int(os.getenv("POSTGRES_MAX_CONNECTIONS", "100")) - 10) // GUNICORN_WORKERS,
+        ))),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+else:
+    # Without the pool (e.g. behind PgBouncer), keep each thread's
+    # connection for DB_CONN_MAX_AGE seconds; 0 closes it after each request.
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "0"))
+
 
 TEST_RUNNER = "chronoguess.test_runner.CustomTestRunner"
 
+# Per-request timing, query counts and Server-Timing headers; the
+# middleware removes itself from the stack when this is off.
+REQUEST_METRICS_ENABLED = os.getenv("REQUEST_METRICS_ENABLED", "False").upper() == "TRUE"
+
+# /api/_catalog/ and /api/_metrics expose cache and route internals: they
+# answer 404 unless enabled, and then only to INTERNAL_IPS and staff users.
+INTERNAL_ENDPOINTS_ENABLED = os.getenv("INTERNAL_ENDPOINTS_ENABLED", "False").upper() == "TRUE"
+INTERNAL_IPS = os.getenv("INTERNAL_IPS", "127.0.0.1").split(",")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "chronoguess.requests": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Card data is read through this cache. The default is a per-worker LRU;
+# point it at a shared backend (file, database) so that catalog changes
+# made by another process are seen by every worker.
+CATALOG_CACHE_ALIAS = "catalog"
+MATCH_STORE_CACHE_ALIAS = "match_store"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    MATCH_STORE_CACHE_ALIAS: {
+        "BACKEND": os.getenv("MATCH_STORE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("MATCH_STORE_CACHE_LOCATION", "chronoguess-matches"),
+        "TIMEOUT": None,
+    },
+    CATALOG_CACHE_ALIAS: {
+        "BACKEND": os.getenv("CATALOG_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CATALOG_CACHE_LOCATION", "chronoguess-catalog"),
+        "TIMEOUT": int(os.getenv("CATALOG_CACHE_TIMEOUT", "3600")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "50000")),
+        },
+    },
+}
+
+# Seconds a worker keeps its per-language occurrence id index before
+# reloading it. Changes made in the same process invalidate it right away.
+SAMPLER_INDEX_TTL = int(os.getenv("SAMPLER_INDEX_TTL", "300"))
+
+# Pre-dealt games fill_game_pool keeps ready per language. New matches claim
+# one of them and only deal in the request when the pool runs dry; 0 turns
+# the pool off.
+GAME_POOL_SIZE = int(os.getenv("GAME_POOL_SIZE", "0"))
+
+# Encoder for match responses: "orjson", "json" (stdlib) or "auto", which
+# uses orjson when the fast-json extra is installed.
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+
+# Cache alias holding each match's version for conditional GETs. Must be
+# shared by all workers (e.g. Redis or Memcached); unset, the version is
+# read from the primary key index.
+MATCH_VERSION_CACHE_ALIAS = os.getenv("MATCH_VERSION_CACHE_ALIAS") or None
+
+# Where ongoing matches are read and played: DatabaseMatchRepository, or
+# CacheMatchRepository to keep them in the MATCH_STORE_CACHE_ALIAS cache and
+# write the match row every MATCH_STORE_FLUSH_EVERY plays and at the end.
+# That cache holds the per-match lock, so with more than one worker it must
+# be shared (Redis, Memcached).
+MATCH_REPOSITORY = os.getenv("MATCH_REPOSITORY", "chronoguess.core.repositories.DatabaseMatchRepository")
+MATCH_STORE_FLUSH_EVERY = int(os.getenv("MATCH_STORE_FLUSH_EVERY", "5"))
+# Seconds a play waits for another play's lock on the match before it is
+# answered with 409.
+MATCH_STORE_LOCK_WAIT = float(os.getenv("MATCH_STORE_LOCK_WAIT", "2"))
+# Seconds a cached match outlives its last play; it is read back from its
+# row and the play log after that.
+MATCH_STORE_TTL = int(os.getenv("MATCH_STORE_TTL", "86400"))
+
+# Fan-out of play events to /api/match/<id>/events/ streams: PostgresBroker
+# (LISTEN/NOTIFY, reaches every worker) or InProcessBroker (one worker only).
+MATCH_EVENT_BROKER = os.getenv("MATCH_EVENT_BROKER", "chronoguess.core.events.PostgresBroker")
+# Seconds between keep-alive comments on an idle event stream.
+MATCH_EVENTS_KEEPALIVE = float(os.getenv("MATCH_EVENTS_KEEPALIVE", "15"))
+
+# How long /api/occurrences/stats/ serves a cached answer; the counters
+# behind it only move when aggregate_play_stats runs.
+OCCURRENCE_STATS_CACHE_SECONDS = int(os.getenv("OCCURRENCE_STATS_CACHE_SECONDS", "60"))
+
 # Password validationchecking failed - http://localhost:5173 does not match any trusted origins.
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -1,2 +1,12 @@
+import os
+
 bind = "0.0.0.0:8000"
-workers = 3
\ No newline at end of file
+workers = int(os.getenv("GUNICORN_WORKERS", "3"))
+
+# The match views are async. Under uvicorn workers each process serves
+# chronoguess.asgi:application and keeps many requests in flight at once;
+# set GUNICORN_WORKER_CLASS=sync to serve chronoguess.wsgi:application
+# with one request per worker instead.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+# Left off the command line, which would override it.
+wsgi_app = "chronoguess.wsgi:application" if worker_class == "sync" else "chronoguess.asgi:application"